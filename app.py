@@ -18,6 +18,7 @@ from services.proxy import HLSProxy
 from config import PORT, RECORDINGS_DIR, APP_VERSION
 from services.recording_manager import RecordingManager
 from routes.recordings import setup_recording_routes
+from utils.http_session import shutdown_sessions
 
 logger = logging.getLogger(__name__)
 
@@ -126,6 +127,7 @@ def create_app():
     
     async def cleanup_handler(app):
         await proxy.cleanup()
+        await shutdown_sessions()
     app.on_cleanup.append(cleanup_handler)
     
     async def on_startup(app):
@@ -1,7 +1,9 @@
 import os
 import shutil
 import logging
+import hmac
 import random
+import itertools
 import socket
 import time
 import asyncio
@@ -563,6 +565,26 @@ def _next_from_source(current_proxy: str | None) -> str | None:
     return None
 
 
+_PROXY_CYCLES: dict[tuple, itertools.cycle] = {}
+
+
+def next_round_robin_proxy(proxies: list | None) -> str | None:
+    """Round-robin over a preshuffled copy of `proxies`.
+
+    Spreads load evenly (random.choice can keep hitting the same dead proxy)
+    and costs a single next() per call. One cycle is kept per distinct list.
+    """
+    if not proxies:
+        return None
+    key = tuple(proxies)
+    cycle = _PROXY_CYCLES.get(key)
+    if cycle is None:
+        if len(_PROXY_CYCLES) >= 32:
+            _PROXY_CYCLES.clear()
+        cycle = _PROXY_CYCLES[key] = itertools.cycle(random.sample(key, len(key)))
+    return next(cycle)
+
+
 def get_proxy_for_url(
     url: str,
     transport_routes: list = None,
@@ -646,7 +668,7 @@ def get_proxy_for_url(
             SELECTED_PROXY_CONTEXT.set(proxy)
             return proxy
 
-    proxy = random.choice(global_proxies) if global_proxies else None
+    proxy = next_round_robin_proxy(global_proxies)
     # ✅ FIX: Se bypass_warp=True e il proxy pescato da GLOBAL_PROXIES è WARP, ignoriamo
     if bypass_warp and _WARP_PROXY_URL and proxy == _WARP_PROXY_URL:
         proxy = None
@@ -675,7 +697,7 @@ def get_proxy_for_url(
         SELECTED_PROXY_CONTEXT.set(proxy)
         return proxy
 
-    proxy = random.choice(global_proxies) if global_proxies else None
+    proxy = next_round_robin_proxy(global_proxies)
     if proxy and is_proxy_alive(proxy):
         return proxy
 
@@ -768,21 +790,29 @@ def get_ssl_setting_for_url(url: str, transport_routes: list = None) -> bool:
 
 API_PASSWORD = os.environ.get("API_PASSWORD")
 PORT = int(os.environ.get("PORT", 7860))
+_API_PASSWORD_BYTES = API_PASSWORD.encode("utf-8") if API_PASSWORD else b""
+
+
+def _password_matches(candidate):
+    """Confronto a tempo costante con la password API (niente timing leak)."""
+    return candidate is not None and hmac.compare_digest(
+        candidate.encode("utf-8", "replace"), _API_PASSWORD_BYTES
+    )
+
 
 def check_password(request):
     """Verifica la password API se impostata."""
     if not API_PASSWORD:
         return True
 
-    api_password_param = request.query.get("api_password")
-    if api_password_param == API_PASSWORD:
+    if _password_matches(request.query.get("api_password")):
         return True
 
-    if request.headers.get("x-api-password") == API_PASSWORD:
+    if _password_matches(request.headers.get("x-api-password")):
         return True
 
     # Cookie-based auth (set by /api/admin/login)
-    if request.cookies.get("admin_token") == API_PASSWORD:
+    if _password_matches(request.cookies.get("admin_token")):
         return True
 
     return False
@@ -1,9 +1,11 @@
+import json
 import logging
 import asyncio
+from types import MappingProxyType
+from urllib.parse import urljoin
 import aiohttp
-from aiohttp import ClientSession, ClientTimeout, TCPConnector, ClientConnectionError
+from aiohttp import ClientConnectionError
 from config import (
-    get_connector_for_proxy,
     SELECTED_PROXY_CONTEXT,
     STRICT_PROXY_CONTEXT,
     mark_proxy_dead,
@@ -11,22 +13,91 @@ from config import (
     ALL_PROXY_ERRORS,
 )
 import config as _cfg
+from utils.http_session import get_shared_session, DEFAULT_USER_AGENT
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+BASE_HEADERS = MappingProxyType({"User-Agent": DEFAULT_USER_AGENT})
+
 class ExtractorError(Exception):
     pass
 
+
+class MockResponse:
+    """Detached snapshot of an aiohttp response returned by _make_request."""
+
+    def __init__(self, text, status, headers, url, cookies, match=None):
+        self.text = text
+        self.status = status
+        self.headers = headers
+        self.url = url
+        self.cookies = cookies
+        self.match = match
+
+    @property
+    def json(self):
+        try:
+            return json_loads(self.text)
+        except Exception:
+            return {}
+
+
+async def find_first(response, pattern, chunk_size: int = 65536, overlap: int = 65536,
+                     max_bytes: int = 16 << 20):
+    """Scan a response body chunk by chunk for a compiled bytes `pattern`.
+
+    Returns the first match as soon as it appears, without reading (or
+    decoding) the rest of the body; None if the body has no match.
+
+    Each search only covers the new chunk plus the `overlap` bytes before
+    it, so the scan stays linear in the page size: `pattern` must match
+    within `overlap` bytes. Bodies over max_bytes are given up on, loudly.
+    """
+    buf = bytearray()
+    async for chunk in response.content.iter_chunked(chunk_size):
+        start = max(0, len(buf) - overlap)
+        buf += chunk
+        match = pattern.search(buf, start)
+        if match:
+            return match
+        if len(buf) >= max_bytes:
+            logger.warning(
+                f"find_first: no match in the first {len(buf)} bytes of {response.url}, giving up"
+            )
+            break
+    return None
+
+def resolve_url(base: str, ref: str) -> str:
+    """urljoin(base, ref), skipping the URL parsing when ref is already absolute."""
+    if ref.startswith(("http://", "https://")):
+        return ref
+    return urljoin(base, ref)
+
 class BaseExtractor:
     """Base class for extractors with robust networking and proxy fallback."""
+
+    # Subclasses that do not declare __slots__ simply get a __dict__ back
+    __slots__ = (
+        "request_headers",
+        "base_headers",
+        "session",
+        "mediaflow_endpoint",
+        "proxies",
+        "extractor_name",
+        "_session_proxy",
+    )
     
     def __init__(self, request_headers: dict, proxies: list = None, extractor_name: str = "generic"):
         self.request_headers = request_headers
-        self.base_headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-        }
+        # Shared and read-only: extract() builds per-call headers on top of it
+        self.base_headers = BASE_HEADERS
         self.session = None
-        self._session_lock = asyncio.Lock()
         self.mediaflow_endpoint = "hls_proxy"
         self.proxies = proxies or []
         self.extractor_name = extractor_name
@@ -35,39 +106,20 @@ class BaseExtractor:
 
     async def _get_session(self, url: str = None):
         proxy = await get_preferred_proxy_for_url(url, self.extractor_name, self.proxies or _cfg.GLOBAL_PROXIES)
-
-        async with self._session_lock:
-            if (
-                self.session is None
-                or self.session.closed
-                or self._session_proxy != proxy
-            ):
-                if self.session and not self.session.closed:
-                    await self.session.close()
-
-                timeout = ClientTimeout(total=60, connect=30, sock_read=30)
-
-                if proxy:
-                    connector = get_connector_for_proxy(proxy)
-                else:
-                    connector = TCPConnector(
-                        limit=0, 
-                        limit_per_host=0, 
-                        keepalive_timeout=15, 
-                        enable_cleanup_closed=True, 
-                        use_dns_cache=True
-                    )
-                
-                self.session = ClientSession(
-                    timeout=timeout, 
-                    connector=connector, 
-                    headers={'User-Agent': self.base_headers["User-Agent"]}
-                )
-                self._session_proxy = proxy
+        # Sessions are pooled per proxy and shared by every extractor instance
+        self.session = get_shared_session(proxy)
+        self._session_proxy = proxy
         return self.session
 
-    async def _make_request(self, url: str, method: str = "GET", headers: dict = None, retries: int = 2, **kwargs):
-        """Perform a robust request with proxy fallback."""
+    async def _make_request(self, url: str, method: str = "GET", headers: dict = None, retries: int = 2, pattern=None, raw: bool = False, **kwargs):
+        """Perform a robust request with proxy fallback.
+
+        If `pattern` (a compiled bytes regex) is given, the body is scanned
+        with find_first() instead of being read as text: the result's `.match`
+        holds the first match and `.text` is empty (the match must fit in
+        find_first()'s overlap window).
+        With `raw=True` the body is not decoded: `.text` holds the bytes.
+        """
         final_headers = headers or {}
         if "User-Agent" not in final_headers:
             final_headers["User-Agent"] = self.base_headers["User-Agent"]
@@ -87,24 +139,11 @@ class BaseExtractor:
                         # Restituisci un MockResponse "vuoto" o che indica il bypass
                         return MockResponse("", response.status, response.headers, str(response.url), response.cookies)
 
-                    content = await response.text()
-                    
-                    class MockResponse:
-                        def __init__(self, text, status, headers, url, cookies):
-                            self.text = text
-                            self.status = status
-                            self.headers = headers
-                            self.url = url
-                            self.cookies = cookies
-                        
-                        @property
-                        def json(self):
-                            import json
-                            try:
-                                return json.loads(self.text)
-                            except Exception:
-                                return {}
-                    
+                    if pattern is not None:
+                        match = await find_first(response, pattern)
+                        return MockResponse("", response.status, response.headers, str(response.url), response.cookies, match)
+
+                    content = await response.read() if raw else await response.text()
                     return MockResponse(content, response.status, response.headers, str(response.url), response.cookies)
             except ALL_PROXY_ERRORS + (asyncio.TimeoutError, ClientConnectionError, aiohttp.ClientResponseError) as e:
                 is_proxy_err = isinstance(e, ALL_PROXY_ERRORS)
@@ -114,12 +153,8 @@ class BaseExtractor:
                 status = getattr(e, 'status', None)
                 logger.warning(f"[{self.extractor_name}] Attempt {attempt+1} failed for {url}: {e}")
                 
-                # Reset session
-                async with self._session_lock:
-                    if session and not session.closed:
-                        await session.close()
-                    if self.session is session:
-                        self.session = None
+                # Reset session (shared: drop our reference, never close it)
+                self.session = None
                 
                 if is_proxy_err and SELECTED_PROXY_CONTEXT.get() and not STRICT_PROXY_CONTEXT.get():
                     proxy_to_mark = SELECTED_PROXY_CONTEXT.get()
@@ -135,6 +170,6 @@ class BaseExtractor:
         raise ExtractorError(f"Request failed for {url}")
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        # The session belongs to the shared pool (utils.http_session)
+        self.session = None
 
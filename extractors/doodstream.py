@@ -10,6 +10,7 @@ from urllib.parse import urljoin, urlparse
 import cloudscraper
 from config import get_preferred_proxy_for_url
 from utils.cookie_cache import CookieCache
+from utils.fast_re import compile_re
 
 logger = logging.getLogger(__name__)
 
@@ -23,15 +24,35 @@ _DOOD_UA = (
     "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 )
 
+# Page patterns are bytes: the embed page is matched undecoded and only the
+# (ASCII) captures are decoded.
+_PASS_PATH_PATTERNS = tuple(compile_re(p, re.I) for p in (
+    rb"['\"](/pass_md5/[^'\"]+)['\"]",
+    rb"\.get\(\s*['\"](/pass_md5/[^'\"]+)['\"]",
+    rb"(/pass_md5/[A-Za-z0-9\-._]+/[A-Za-z0-9]+)",
+))
+_TOKEN_PATTERNS = tuple(compile_re(p, re.I | re.S) for p in (
+    rb"makePlay\(\)\s*\{.*?\?token=([A-Za-z0-9]+)&expiry=",
+    rb"\?token=([A-Za-z0-9]+)&expiry=",
+    rb"token=([A-Za-z0-9]+)",
+    rb"['\"]?token['\"]?\s*[:=]\s*['\"]([A-Za-z0-9]+)['\"]",
+    rb"window\.[a-z0-9_]+\s*=\s*['\"]([A-Za-z0-9]{20,})['\"]",
+))
+_TOKEN_TAIL_RE = compile_re(r"[A-Za-z0-9]{8,}")
+_EXPIRY_RE = compile_re(rb"expiry[:=]\s*['\"]?(\d{10,})['\"]?", re.I)
+_EXPIRY_MS_RE = compile_re(rb"expiry=.*Date\.now\(\)", re.I | re.S)
+_TITLE_RE = compile_re(rb"<title>(.*?)</title>", re.I)
+_WHITESPACE_RE = compile_re(r"\s+")
+
 class DoodStreamExtractor:
     """
     DoodStream / PlayMogo extractor using cloudscraper.
     """
 
+    __slots__ = ("request_headers", "proxies", "last_used_proxy", "mediaflow_endpoint", "cache")
+
     def __init__(self, request_headers: dict = None, proxies: list = None):
         self.request_headers = request_headers or {}
-        self.base_headers = self.request_headers.copy()
-        self.base_headers["User-Agent"] = _DOOD_UA
         self.proxies = proxies or []
         self.last_used_proxy = None
         self.mediaflow_endpoint = "proxy_stream_endpoint"
@@ -58,52 +79,41 @@ class DoodStreamExtractor:
         self.last_used_proxy = proxy_url
         return {"http": proxy_url, "https": proxy_url}
 
-    def _extract_pass_path(self, html: str) -> str | None:
-        patterns = [
-            r"['\"](/pass_md5/[^'\"]+)['\"]",
-            r"\.get\(\s*['\"](/pass_md5/[^'\"]+)['\"]",
-            r"(/pass_md5/[A-Za-z0-9\-._]+/[A-Za-z0-9]+)",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, html, re.I)
+    def _extract_pass_path(self, html: bytes) -> str | None:
+        for pattern in _PASS_PATH_PATTERNS:
+            match = pattern.search(html)
             if match:
-                return match.group(1)
+                return match.group(1).decode("utf-8", "replace")
         return None
 
-    def _extract_token(self, html: str, pass_path: str | None = None) -> str | None:
+    def _extract_token(self, html: bytes, pass_path: str | None = None) -> str | None:
         if pass_path:
             tail = pass_path.rstrip("/").split("/")[-1]
-            if re.fullmatch(r"[A-Za-z0-9]{8,}", tail):
+            if _TOKEN_TAIL_RE.fullmatch(tail):
                 return tail
 
-        patterns = [
-            r"makePlay\(\)\s*\{.*?\?token=([A-Za-z0-9]+)&expiry=",
-            r"\?token=([A-Za-z0-9]+)&expiry=",
-            r"token=([A-Za-z0-9]+)",
-            r"['\"]?token['\"]?\s*[:=]\s*['\"]([A-Za-z0-9]+)['\"]",
-            r"window\.[a-z0-9_]+\s*=\s*['\"]([A-Za-z0-9]{20,})['\"]",
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, html, re.I | re.S)
+        for pattern in _TOKEN_PATTERNS:
+            match = pattern.search(html)
             if match:
-                return match.group(1)
+                return match.group(1).decode("ascii")
         return None
 
-    def _extract_expiry(self, html: str) -> str:
-        expiry_match = re.search(r"expiry[:=]\s*['\"]?(\d{10,})['\"]?", html, re.I)
+    def _extract_expiry(self, html: bytes) -> str:
+        expiry_match = _EXPIRY_RE.search(html)
         if expiry_match:
-            return expiry_match.group(1)
-        if re.search(r"expiry=.*Date\.now\(\)", html, re.I | re.S):
-            return str(int(time.time() * 1000))
-        return str(int(time.time()))
+            return expiry_match.group(1).decode("ascii")
+        if _EXPIRY_MS_RE.search(html):
+            return str(time.time_ns() // 1_000_000)
+        return str(time.time_ns() // 1_000_000_000)
 
-    def _is_valid_dood_page(self, html: str) -> bool:
+    def _is_valid_dood_page(self, html: bytes) -> bool:
         if not html: return False
         # Extended markers for newer domains
-        markers = ["pass_md5", "makePlay(", "token=", "get_player(", "vtt", "subtitle"]
+        markers = [b"pass_md5", b"makePlay(", b"token=", b"get_player(", b"vtt", b"subtitle"]
         return any(m in html for m in markers)
 
-    def _log_parse_debug(self, html: str) -> None:
+    def _log_parse_debug(self, html: bytes) -> None:
+        html = html.decode("utf-8", "replace")
         markers = {
             "pass_md5": "pass_md5" in html,
             "makePlay": "makePlay(" in html,
@@ -119,13 +129,48 @@ class DoodStreamExtractor:
             if idx != -1:
                 start = max(0, idx - 180)
                 end = min(len(html), idx + 320)
-                snippet = re.sub(r"\s+", " ", html[start:end]).strip()
+                snippet = _WHITESPACE_RE.sub(" ", html[start:end]).strip()
                 logger.debug(f"DoodStream marker snippet [{marker}]: {snippet}")
                 return
 
-        compact_html = re.sub(r"\s+", " ", html[:1200]).strip()
+        compact_html = _WHITESPACE_RE.sub(" ", html[:1200]).strip()
         logger.debug(f"DoodStream compact HTML snippet (first 1200 chars): {compact_html}")
 
+    async def _fetch_pass_md5(self, scraper, embed_url: str, pass_path: str, scraper_proxies: dict | None):
+        return await asyncio.to_thread(
+            scraper.get,
+            urljoin(embed_url, pass_path),
+            headers={"Referer": embed_url, "User-Agent": _DOOD_UA},
+            timeout=30,
+            proxies=scraper_proxies,
+        )
+
+    async def _stream_embed_page(self, scraper, response, embed_url: str, scraper_proxies: dict | None):
+        """Read the embed page in chunks, firing the pass_md5 request as soon as its path is in.
+
+        Only the first (quote-delimited) pattern is trusted on a partial page:
+        it cannot match a path cut at a chunk boundary, and its leftmost match
+        is the same one _extract_pass_path() finds on the full page. The rest
+        of the body (token, expiry) downloads while pass_md5 is in flight.
+        """
+        chunks = response.iter_content(16384)
+        buf = bytearray()
+        pass_task = None
+        try:
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                buf += chunk
+                if pass_task is None:
+                    match = _PASS_PATH_PATTERNS[0].search(buf)
+                    if match:
+                        pass_task = asyncio.create_task(self._fetch_pass_md5(
+                            scraper, embed_url, match.group(1).decode("utf-8", "replace"), scraper_proxies
+                        ))
+        except BaseException:
+            if pass_task:
+                pass_task.cancel()
+            raise
+        return bytes(buf), pass_task
+
     async def _do_extract_with_proxy(self, embed_url: str, scraper_proxies: dict | None) -> dict | None:
         scraper = cloudscraper.create_scraper(delay=5)
         if scraper_proxies:
@@ -141,34 +186,36 @@ class DoodStreamExtractor:
             headers={"User-Agent": _DOOD_UA},
             timeout=30,
             proxies=scraper_proxies,
+            stream=True,
         )
-        if response.status_code != 200:
-            raise ExtractorError(f"DoodStream: cloudscraper failed to fetch embed page (status {response.status_code})")
-
-        html = response.text
-        title_match = re.search(r"<title>(.*?)</title>", html, re.I)
+        try:
+            if response.status_code != 200:
+                raise ExtractorError(f"DoodStream: cloudscraper failed to fetch embed page (status {response.status_code})")
+            # Raw bytes: skips requests' charset sniffing and a full-page decode
+            html, pass_task = await self._stream_embed_page(scraper, response, embed_url, scraper_proxies)
+        finally:
+            response.close()
+
+        title_match = _TITLE_RE.search(html)
         if title_match:
-            logger.info(f"DoodStream Page Title: {title_match.group(1)}")
+            logger.info(f"DoodStream Page Title: {title_match.group(1).decode('utf-8', 'replace')}")
 
-        if "Just a moment..." in html or "DDoS protection" in html or "cf-browser-verification" in html:
+        if b"Just a moment..." in html or b"DDoS protection" in html or b"cf-browser-verification" in html:
             logger.warning("DoodStream: cloudscraper returned 200 but Cloudflare challenge is present.")
 
         pass_path = self._extract_pass_path(html)
         token = self._extract_token(html, pass_path)
         if not (pass_path and token):
+            if pass_task:
+                pass_task.cancel()
             self._log_parse_debug(html)
             return None
 
-        pass_url = urljoin(embed_url, pass_path)
         logger.info(f"Cloudscraper found pass_md5 path: {pass_path}")
-
-        pass_response = await asyncio.to_thread(
-            scraper.get,
-            pass_url,
-            headers={"Referer": embed_url, "User-Agent": _DOOD_UA},
-            timeout=30,
-            proxies=scraper_proxies,
-        )
+        if pass_task is not None:
+            pass_response = await pass_task
+        else:
+            pass_response = await self._fetch_pass_md5(scraper, embed_url, pass_path, scraper_proxies)
         if pass_response.status_code != 200 or len(pass_response.text) <= 10:
             logger.warning(
                 f"DoodStream: pass_md5 request failed with status {pass_response.status_code} "
@@ -206,7 +253,7 @@ class DoodStreamExtractor:
             logger.error(f"DoodStream: cloudscraper error: {e}")
             raise ExtractorError(f"DoodStream: cloudscraper extraction failed: {e}")
 
-    def _finalize_extraction(self, base_stream: str, html: str, base_url: str, ua: str) -> dict:
+    def _finalize_extraction(self, base_stream: str, html: bytes, base_url: str, ua: str) -> dict:
         if "RELOAD" in base_stream or len(base_stream) < 5:
             raise ExtractorError(f"DoodStream: Captured pass_md5 is invalid ({base_stream[:20]})")
 
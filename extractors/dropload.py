@@ -55,16 +55,10 @@ class DroploadExtractor(BaseExtractor):
         if not final_url:
             raise ExtractorError("Dropload extraction failed: no media URL found")
 
-        self.base_headers["referer"] = url
-        self.base_headers["origin"] = referer.rstrip("/")
         mediaflow_endpoint = "proxy_stream_endpoint" if ".mp4" in final_url else self.mediaflow_endpoint
 
         return {
             "destination_url": urljoin(url, final_url),
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "referer": url, "origin": referer.rstrip("/")},
             "mediaflow_endpoint": mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
@@ -5,9 +5,21 @@ import uuid
 import time
 import asyncio
 import os
+import functools
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from urllib.parse import urlparse
 
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 from Crypto.Hash import SHA256
 from Crypto.PublicKey import ECC
 from Crypto.Signature import DSS
@@ -15,6 +27,13 @@ from Crypto.Signature import DSS
 from extractors.base import BaseExtractor, ExtractorError
 from utils import python_aesgcm
 
+_EMBED_ID_RE = re.compile(r"/e/([A-Za-z0-9]+)")
+_EMBED_API_URL = "{}/api/videos/{}/embed/{}".format
+_ACCESS_API_URL = "{}/api/videos/access/{}".format
+# ParseResult is an immutable namedtuple, safe to share between callers
+_urlparse_cached = functools.lru_cache(maxsize=1024)(urlparse)
+_B64URL_TRANS = bytes.maketrans(b"-_", b"+/")
+
 
 # ──────────────────────────────────────────────────────────────────────
 # Proof-of-Work hash (reverse-engineered from pow--*.js).
@@ -129,7 +148,15 @@ def _solve_pow_parallel(nonce: str, difficulty: int, timeout: float = 25.0):
 
 
 class F16PxExtractor(BaseExtractor):
+    __slots__ = ()
+
     F16PX_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:149.0) Gecko/20100101 Firefox/149.0"
+    # Static part of the playback headers; per-call values are merged with |
+    OUT_HEADERS_TEMPLATE = {
+        "Accept-Language": "en-US,en;q=0.5",
+        "Accept": "*/*",
+        "User-Agent": F16PX_USER_AGENT,
+    }
 
     def __init__(self, request_headers: dict, proxies: list = None):
         super().__init__(request_headers, proxies, extractor_name="f16px")
@@ -137,11 +164,14 @@ class F16PxExtractor(BaseExtractor):
     # ── base64url ──
     @staticmethod
     def _b64url_decode(value: str) -> bytes:
-        value = value.replace("-", "+").replace("_", "/")
-        padding = (-len(value)) % 4
+        padding = -len(value) & 3
         if padding:
             value += "=" * padding
-        return base64.b64decode(value)
+        if pybase64 is not None:
+            # SIMD decoder, handles the URL alphabet natively
+            return pybase64.urlsafe_b64decode(value)
+        # Single translate pass over bytes instead of two str.replace copies
+        return base64.b64decode(value.encode("ascii").translate(_B64URL_TRANS))
 
     @staticmethod
     def _b64url_encode(value: bytes) -> str:
@@ -171,11 +201,12 @@ class F16PxExtractor(BaseExtractor):
         iv = self._b64url_decode(pb["iv"])
         key = self._join_key_parts(pb["key_parts"], pb["version"])
         payload = self._b64url_decode(pb["payload"])
-        cipher = python_aesgcm.new(key)
-        decrypted = cipher.open(iv, payload)
+        # python_aesgcm picks the native backend (cryptography / PyCryptodome)
+        decrypted = python_aesgcm.new(key).open(iv, payload)
         if decrypted is None:
             raise ExtractorError("F16PX: GCM authentication failed")
-        return json.loads(decrypted.decode("utf-8", "ignore")).get("sources") or []
+        # Stray invalid UTF-8 bytes are dropped, not fatal
+        return _json_loads(decrypted.decode("utf-8", "ignore")).get("sources") or []
 
     # ── attestation (ECDSA P-256, raw r||s signature) ──
     def _build_attest_payload(self, challenge: dict) -> dict:
@@ -216,11 +247,11 @@ class F16PxExtractor(BaseExtractor):
         }
 
     async def extract(self, url: str, **kwargs) -> dict:
-        parsed = urlparse(url)
+        parsed = _urlparse_cached(url)
         embed_host = parsed.netloc
         embed_origin = f"{parsed.scheme}://{parsed.netloc}"
 
-        match = re.search(r"/e/([A-Za-z0-9]+)", parsed.path or "")
+        match = _EMBED_ID_RE.search(parsed.path or "")
         if not match:
             raise ExtractorError("F16PX: Invalid embed URL")
         code = match.group(1)
@@ -228,7 +259,7 @@ class F16PxExtractor(BaseExtractor):
 
         # 1) details (on embed host) → embed_frame_url gives the API base + referer
         details_resp = await self._make_request(
-            f"{embed_origin}/api/videos/{code}/embed/details",
+            _EMBED_API_URL(embed_origin, code, "details"),
             headers={
                 "Accept": "application/json, text/plain, */*",
                 "User-Agent": self.F16PX_USER_AGENT,
@@ -238,9 +269,10 @@ class F16PxExtractor(BaseExtractor):
             method="GET",
             retries=1,
         )
-        details = json.loads(details_resp.text)
+        details = _json_loads(details_resp.text)
         frame = details.get("embed_frame_url") or embed_url
-        api_origin = f"{urlparse(frame).scheme}://{urlparse(frame).netloc}"
+        parsed_frame = _urlparse_cached(frame)
+        api_origin = f"{parsed_frame.scheme}://{parsed_frame.netloc}"
         referer = frame
 
         common = {
@@ -256,28 +288,28 @@ class F16PxExtractor(BaseExtractor):
 
         # 2) settings → captcha required?
         settings_resp = await self._make_request(
-            f"{api_origin}/api/videos/{code}/embed/settings",
+            _EMBED_API_URL(api_origin, code, "settings"),
             headers=common, method="GET", retries=1,
         )
         try:
-            captcha_required = bool(json.loads(settings_resp.text).get("captcha_required"))
+            captcha_required = bool(_json_loads(settings_resp.text).get("captcha_required"))
         except Exception:
             captcha_required = True
 
         # 3) challenge
         challenge_resp = await self._make_request(
-            f"{api_origin}/api/videos/access/challenge",
+            _ACCESS_API_URL(api_origin, "challenge"),
             headers=common, method="POST", retries=1, json={},
         )
-        challenge = json.loads(challenge_resp.text)
+        challenge = _json_loads(challenge_resp.text)
 
         # 4) attest (sets viewer/device cookies)
         attest_resp = await self._make_request(
-            f"{api_origin}/api/videos/access/attest",
+            _ACCESS_API_URL(api_origin, "attest"),
             headers=common, method="POST", retries=1,
             json=self._build_attest_payload(challenge),
         )
-        attest = json.loads(attest_resp.text)
+        attest = _json_loads(attest_resp.text)
         fingerprint = {
             "token": attest["token"],
             "viewer_id": attest["viewer_id"],
@@ -292,11 +324,11 @@ class F16PxExtractor(BaseExtractor):
         captcha_token = None
         if captcha_required:
             captcha_resp = await self._make_request(
-                f"{api_origin}/api/videos/{code}/embed/captcha",
+                _EMBED_API_URL(api_origin, code, "captcha"),
                 headers=with_cookie, method="POST", retries=1,
                 json={"fingerprint": fingerprint},
             )
-            cap = json.loads(captcha_resp.text)
+            cap = _json_loads(captcha_resp.text)
             pow_nonce = cap["pow_nonce"]
             pow_difficulty = cap["pow_difficulty"]
             pow_token = cap["pow_token"]
@@ -309,36 +341,30 @@ class F16PxExtractor(BaseExtractor):
                 raise ExtractorError("F16PX: PoW solve timed out")
 
             verify_resp = await self._make_request(
-                f"{api_origin}/api/videos/{code}/embed/captcha/verify",
+                _EMBED_API_URL(api_origin, code, "captcha/verify"),
                 headers=with_cookie, method="POST", retries=1,
                 json={"pow_token": pow_token, "solution": solution, "fingerprint": fingerprint},
             )
-            verify = json.loads(verify_resp.text)
+            verify = _json_loads(verify_resp.text)
             if verify.get("status") != "ok" or not verify.get("token"):
                 raise ExtractorError(f"F16PX: captcha verify failed ({verify})")
             captcha_token = verify["token"]
 
         # 7) playback — verify token rides in X-Captcha-Token header (not the body)
-        playback_headers = dict(with_cookie)
+        # (with_cookie is not used after this, so no copy is needed)
         if captcha_token:
-            playback_headers["X-Captcha-Token"] = captcha_token
+            with_cookie["X-Captcha-Token"] = captcha_token
 
         playback_resp = await self._make_request(
-            f"{api_origin}/api/videos/{code}/embed/playback",
-            headers=playback_headers, method="POST", retries=1,
+            _EMBED_API_URL(api_origin, code, "playback"),
+            headers=with_cookie, method="POST", retries=1,
             json={"fingerprint": fingerprint},
         )
-        data = json.loads(playback_resp.text)
+        data = _json_loads(playback_resp.text)
         if not data:
             raise ExtractorError("F16PX: Empty playback response")
 
-        out_headers = {
-            "referer": referer,
-            "origin": api_origin,
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept": "*/*",
-            "User-Agent": self.F16PX_USER_AGENT,
-        }
+        out_headers = {"referer": referer, "origin": api_origin} | self.OUT_HEADERS_TEMPLATE
 
         # Case 1: plain sources
         if data.get("sources"):
@@ -364,7 +390,3 @@ class F16PxExtractor(BaseExtractor):
             "request_headers": out_headers,
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
@@ -1,9 +1,13 @@
+from urllib.parse import urlsplit
+
 from utils.packed import eval_solver
 from extractors.base import BaseExtractor, ExtractorError
 
 class FastreamExtractor(BaseExtractor):
     """Fastream URL extractor."""
 
+    __slots__ = ()
+
     def __init__(self, request_headers: dict, proxies: list = None):
         super().__init__(request_headers, proxies, extractor_name="fastream")
 
@@ -21,18 +25,18 @@ class FastreamExtractor(BaseExtractor):
 
         final_url = await eval_solver(session, url, headers, patterns)
 
-        domain = url.replace('https://', '').split('/')[0]
-        self.base_headers["referer"] = f"https://{domain}/"
-        self.base_headers["origin"] = f"https://{domain}"
-        self.base_headers["Accept-Language"] = "en-US,en;q=0.5"
-        self.base_headers["Accept"] = "*/*"
+        domain = urlsplit(url).netloc
+        # Fresh dict per call: never mutate shared instance state
+        out_headers = {
+            **self.base_headers,
+            "referer": f"https://{domain}/",
+            "origin": f"https://{domain}",
+            "Accept-Language": "en-US,en;q=0.5",
+            "Accept": "*/*",
+        }
 
         return {
             "destination_url": final_url,
-            "request_headers": self.base_headers,
+            "request_headers": out_headers,
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
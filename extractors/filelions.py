@@ -21,13 +21,8 @@ class FileLionsExtractor(BaseExtractor):
 
         final_url = await eval_solver(session, url, headers, patterns)
 
-        self.base_headers["referer"] = url
         return {
             "destination_url": final_url,
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "referer": url},
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
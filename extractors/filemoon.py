@@ -1,3 +1,4 @@
+import functools
 import logging
 import random
 import re
@@ -6,34 +7,40 @@ from aiohttp import ClientSession, ClientTimeout, TCPConnector
 from aiohttp_socks import ProxyConnector
 from config import get_proxy_for_url, get_connector_for_proxy
 from utils.packed import eval_solver
+from utils.fast_re import compile_re
 
 from extractors.base import BaseExtractor, ExtractorError
 
+_IFRAME_RE = compile_re(rb'iframe.*?src=["\']([^"\']*)["\']', re.DOTALL)
+# ParseResult is an immutable namedtuple, safe to share between callers
+_urlparse_cached = functools.lru_cache(maxsize=1024)(urlparse)
+
 class FileMoonExtractor(BaseExtractor):
     """FileMoon URL extractor."""
 
+    __slots__ = ()
+
     def __init__(self, request_headers: dict, proxies: list = None):
         super().__init__(request_headers, proxies, extractor_name="filemoon")
 
     async def extract(self, url: str, **kwargs) -> dict:
         """Extract FileMoon URL."""
-        resp = await self._make_request(url)
-        text = resp.text
+        # Stop downloading the page as soon as the iframe shows up
+        resp = await self._make_request(url, pattern=_IFRAME_RE)
         response_url = resp.url
 
-        pattern = r'iframe.*?src=["\']([^"\']*)["\']'
-        match = re.search(pattern, text, re.DOTALL)
+        match = resp.match
         if not match:
             raise ExtractorError("Failed to extract iframe URL")
 
-        iframe_url = match.group(1)
+        iframe_url = match.group(1).decode("utf-8", "replace")
 
-        parsed = urlparse(response_url)
+        parsed = _urlparse_cached(response_url)
         base_url = f"{parsed.scheme}://{parsed.netloc}"
 
         if iframe_url.startswith("//"):
             iframe_url = f"{parsed.scheme}:{iframe_url}"
-        elif not urlparse(iframe_url).scheme:
+        elif not _urlparse_cached(iframe_url).scheme:
             iframe_url = urljoin(base_url, iframe_url)
 
         headers = {"Referer": url}
@@ -50,14 +57,8 @@ class FileMoonExtractor(BaseExtractor):
                  raise ExtractorError("Stream not found (404)")
             raise
 
-        self.base_headers["referer"] = url
-
         return {
             "destination_url": final_url,
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "referer": url},
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
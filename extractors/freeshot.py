@@ -1,14 +1,36 @@
 import logging
+import random
 import re
 import asyncio
 import urllib.parse
+from types import MappingProxyType
 import aiohttp
-from aiohttp import ClientSession, ClientTimeout, TCPConnector
-from config import get_connector_for_proxy, get_preferred_proxy_for_url
+from config import get_preferred_proxy_for_url
 import config as _cfg
+from utils.http_session import get_shared_session
+from utils.fast_re import compile_re
 
 logger = logging.getLogger(__name__)
 
+_EMBED_CODE_RE = compile_re(r'embed/([^/.]+)\.php')
+_STREAM_PARAM_RE = compile_re(r'stream=([^&"\'\s]+)')
+_STREAM_URL_RE = compile_re(r'streamUrl\s*:\s*"([^"]+)"')
+_IFRAME_SRC_RE = compile_re(r'frameborder="0"\s+src="([^"]+)"', re.IGNORECASE)
+_TOKEN_Q_RE = compile_re(r'token=([^&]+)')
+
+# Constant for every instance: shared read-only instead of rebuilt per __init__
+_BASE_HEADERS = MappingProxyType({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
+    "Referer": "https://thisnot.business/",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+})
+
+_PLAYER_URL = "https://popcdn.day/player/{}".format
+_LEGACY_M3U8_URL = "https://planetary.lovecdn.ru/{}/tracks-v1a1/mono.m3u8?token={}".format
+
+# CancelledError is deliberately not retried: let the task die promptly
+_RETRYABLE_ERRORS = (asyncio.TimeoutError, aiohttp.ClientError)
+
 class ExtractorError(Exception):
     pass
 
@@ -17,16 +39,14 @@ class FreeshotExtractor:
     Extractor per Freeshot (popcdn.day).
     Risolve l'URL iframe e restituisce l'm3u8 finale.
     """
+    __slots__ = ("request_headers", "base_headers", "proxies", "session", "_session_proxy")
+
     MAX_RETRIES = 3
-    RETRY_DELAYS = [1, 2, 4]  # Exponential backoff in seconds
+    RETRY_DELAYS = [1, 2, 4]  # Exponential backoff in seconds (+ up to 0.5s jitter)
     
     def __init__(self, request_headers=None, proxies=None):
         self.request_headers = request_headers or {}
-        self.base_headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
-            "Referer": "https://thisnot.business/",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
-        }
+        self.base_headers = _BASE_HEADERS
         self.proxies = proxies or _cfg.GLOBAL_PROXIES
         self.session = None
         self._session_proxy = None
@@ -35,25 +55,25 @@ class FreeshotExtractor:
 
     async def _get_session(self, url: str = None):
         proxy = await get_preferred_proxy_for_url(url, "freeshot", self.proxies)
-        if (
-            self.session is None
-            or self.session.closed
-            or self._session_proxy != proxy
-        ):
-            if self.session and not self.session.closed:
-                await self.session.close()
-            connector = get_connector_for_proxy(proxy, ssl=False) if proxy else TCPConnector(ssl=False, limit=0, use_dns_cache=True)
-            timeout = ClientTimeout(total=30)
-            self.session = ClientSession(connector=connector, timeout=timeout)
-            self._session_proxy = proxy
+        self.session = get_shared_session(proxy)
+        self._session_proxy = proxy
         return self.session
 
     async def _fetch_text(self, url: str, headers: dict) -> str:
-        session = await self._get_session(url)
-        async with session.get(url, headers=headers, timeout=15) as resp:
-            if resp.status == 200:
-                return await resp.text()
-            raise ExtractorError(f"Freeshot fetch failed for {url}: HTTP {resp.status}")
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                session = await self._get_session(url)
+                async with session.get(url, headers=headers, timeout=15, ssl=False) as resp:
+                    if resp.status == 200:
+                        return await resp.text()
+                    raise ExtractorError(f"Freeshot fetch failed for {url}: HTTP {resp.status}")
+            except _RETRYABLE_ERRORS as e:
+                if attempt == self.MAX_RETRIES - 1:
+                    raise ExtractorError(f"Freeshot fetch failed for {url} after {self.MAX_RETRIES} attempts: {e!r}")
+                # Jitter avoids synchronized retries from concurrent callers
+                delay = self.RETRY_DELAYS[attempt] + random.uniform(0, 0.5)
+                logger.debug(f"FreeshotExtractor: tentativo {attempt + 1} fallito per {url} ({e!r}), riprovo tra {delay:.1f}s")
+                await asyncio.sleep(delay)
 
     async def extract(self, url, **kwargs):
         """
@@ -71,7 +91,7 @@ class FreeshotExtractor:
         # 1. Supporto per freeshot.live
         if "freeshot.live" in url:
             # Se è già un link embed, estrai direttamente (es: https://freeshot.live/embed/ZonaDAZN.php)
-            embed_match = re.search(r'embed/([^/.]+)\.php', url)
+            embed_match = _EMBED_CODE_RE.search(url)
             if embed_match:
                 channel_code = embed_match.group(1)
                 logger.debug(f"FreeshotExtractor: Estratto codice {channel_code} da URL embed")
@@ -85,22 +105,22 @@ class FreeshotExtractor:
 
                 if content:
                     # 1. Cerca iframe popcdn diretto: //popcdn.day/go.php?stream=ZonaDAZN
-                    match_pop = re.search(r'stream=([^&"\'\s]+)', content)
+                    match_pop = _STREAM_PARAM_RE.search(content)
                     if match_pop:
                         channel_code = match_pop.group(1)
                         logger.debug(f"FreeshotExtractor: Trovato codice {channel_code} (popcdn stream) in pagina freeshot.live")
                     else:
                         # 2. Cerca iframe embed: //freeshot.live/embed/ZonaDAZN.php
-                        match_emb = re.search(r'embed/([^/.]+)\.php', content)
+                        match_emb = _EMBED_CODE_RE.search(content)
                         if match_emb:
                             channel_code = match_emb.group(1)
                             logger.debug(f"FreeshotExtractor: Trovato codice {channel_code} (embed link) in pagina freeshot.live")
 
         # 2. Estrai il codice dai vari formati popcdn
         if "go.php?stream=" in channel_code:
-            channel_code = channel_code.split("go.php?stream=")[-1].split("&")[0]
+            channel_code = channel_code.rpartition("go.php?stream=")[2].partition("&")[0]
         elif "popcdn.day/player/" in channel_code:
-            channel_code = channel_code.split("/player/")[-1].split("?")[0].split("/")[0]
+            channel_code = channel_code.rpartition("/player/")[2].partition("?")[0].partition("/")[0]
         elif channel_code.startswith('http'):
             # Se è ancora un URL freeshot.live, proviamo a estrarre il codice dalla fine (ultimo tentativo disperato)
             # es: /live-tv/zona-dazn-it/351 -> se non abbiamo trovato nulla, proviamo a pulire
@@ -122,13 +142,13 @@ class FreeshotExtractor:
                 channel_code = candidate
             else:
                 # Fallback estremo: prendi l'ultima parte
-                channel_code = channel_code.split("/")[-1]
+                channel_code = channel_code.rpartition("/")[2]
         
         # Rimuovi eventuali parametri residui
-        channel_code = channel_code.split("?")[0].split("&")[0]
+        channel_code = channel_code.partition("?")[0].partition("&")[0]
         
         # Nuovo URL formato /player/
-        target_url = f"https://popcdn.day/player/{urllib.parse.quote(channel_code)}"
+        target_url = _PLAYER_URL(urllib.parse.quote(channel_code))
 
         logger.debug(f"FreeshotExtractor: Risoluzione {target_url} (channel: {channel_code})")
         
@@ -143,18 +163,18 @@ class FreeshotExtractor:
         
         # Token extraction (no need for try-except wrapper since ExtractorError propagates)
         # Nuova estrazione token via currentToken
-        match = re.search(r'streamUrl\s*:\s*"([^"]+)"', body)
+        match = _STREAM_URL_RE.search(body)
         if not match:
             # Fallback al vecchio metodo iframe
-            match = re.search(r'frameborder="0"\s+src="([^"]+)"', body, re.IGNORECASE)
+            match = _IFRAME_SRC_RE.search(body)
             if match:
                 iframe_url = match.group(1)
                 # Estrai token dall'iframe URL
-                token_match = re.search(r'token=([^&]+)', iframe_url)
+                token_match = _TOKEN_Q_RE.search(iframe_url)
                 if token_match:
                     token = token_match.group(1)
                     # Nuovo formato URL m3u8: tracks-v1a1/mono.m3u8
-                    m3u8_url = f"https://planetary.lovecdn.ru/{channel_code}/tracks-v1a1/mono.m3u8?token={token}"
+                    m3u8_url = _LEGACY_M3U8_URL(channel_code, token)
                 else:
                     raise ExtractorError("Freeshot token not found in iframe")
             else:
@@ -178,5 +198,5 @@ class FreeshotExtractor:
         }
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        # Shared session (utils.http_session): nothing to close per instance
+        self.session = None
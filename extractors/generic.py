@@ -104,7 +104,3 @@ class GenericHLSExtractor(BaseExtractor):
             "request_headers": headers, 
             "mediaflow_endpoint": "hls_proxy"
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
@@ -1,23 +1,82 @@
+import asyncio
+import functools
 import re
-from urllib.parse import urljoin, urlparse, unquote
-from aiohttp import FormData
-from extractors.base import BaseExtractor, ExtractorError
+import time
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
+from extractors.base import BaseExtractor, ExtractorError, resolve_url
+from utils.fast_re import compile_re
+
+# Bounded quantifiers: a page without play_method can no longer make the
+# lazy gap rescan the rest of the document from every player_api hit
+_ADMIN_AJAX_RE = compile_re(r'"player_api"\s*:\s*"([^"]{1,2048})"[\s\S]{0,4096}?"play_method"\s*:\s*"([^"]{1,64})"')
+# Player options are parsed one <li> window at a time (see _get_player_options)
+_OPTION_MARKER = "dooplay_player_option"
+_OPTION_WINDOW = 2048
+_PLAYER_OPTION_TAG_RE = compile_re(
+    r'<li[^>]*class=["\']dooplay_player_option["\'][^>]*data-type=["\']([^"\']*)["\'][^>]*data-post=["\']([^"\']*)["\'][^>]*data-nume=["\']([^"\']*)["\'][^>]*>'
+)
+_OPTION_TITLE_RE = compile_re(r'<span class=["\']title["\']>([^<]*)</span>')
+# clearkeys {"kid": "key"} or k1/k2, in a single scan of the channel block
+_DRM_KEYS_RE = compile_re(
+    r'["\']?clearkeys["\']?\s*:\s*{\s*["\'](?P<ck_id>.+?)["\']:\s*["\'](?P<ck>.+?)["\']'
+    r'|["\']?k1["\']?\s*:\s*["\'](?P<k1>.+?)["\'],\s*["\']?k2["\']?\s*:\s*["\'](?P<k2>.+?)["\']'
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _channel_url_pattern(channel_id: str):
+    """Per-channel `"<id>": {url: "..."}` pattern; the same channels come up repeatedly."""
+    return re.compile(rf'{re.escape(channel_id)}["\']:\s*{{\s*["\']?url["\']?\s*:\s*["\']([^"\']+)["\']')
 
 class LiveTVExtractor(BaseExtractor):
     """LiveTV URL extractor for both M3U8 and MPD streams."""
 
+    # Patterns for stream URL extraction (compiled once, shared by all instances)
+    FALLBACK_PATTERN = re.compile(
+        r"source: [\'\"](.*?)[\'\"]\s*,\s*[\s\S]*?mimeType: [\'\"](application/x-mpegURL|application/vnd\.apple\.mpegURL|application/dash\+xml)[\'\"]",
+        re.IGNORECASE,
+    )
+    ANY_M3U8_PATTERN = re.compile(
+        r'["\']?(https?://.*?\.m3u8(?:\?[^"\']*)?)["\'"]?',
+        re.IGNORECASE,
+    )
+
+    # Single-flight iframe fetches: url -> (future, started_at), shared by all instances
+    _iframe_cache = {}
+    _iframe_cache_ttl = 30
+    _iframe_cache_max_entries = 256
+
     def __init__(self, request_headers: dict, proxies: list = None):
         super().__init__(request_headers, proxies, extractor_name="livetv")
-        
-        # Patterns for stream URL extraction
-        self.fallback_pattern = re.compile(
-            r"source: [\'\"](.*?)[\'\"]\s*,\s*[\s\S]*?mimeType: [\'\"](application/x-mpegURL|application/vnd\.apple\.mpegURL|application/dash\+xml)[\'\"]",
-            re.IGNORECASE,
-        )
-        self.any_m3u8_pattern = re.compile(
-            r'["\']?(https?://.*?\.m3u8(?:\?[^"\']*)?)["\'"]?',
-            re.IGNORECASE,
-        )
+
+    @classmethod
+    def _prune_iframe_cache(cls, now: float):
+        expired = [key for key, (_, ts) in cls._iframe_cache.items() if now - ts >= cls._iframe_cache_ttl]
+        for key in expired:
+            cls._iframe_cache.pop(key, None)
+        while len(cls._iframe_cache) > cls._iframe_cache_max_entries:
+            cls._iframe_cache.pop(next(iter(cls._iframe_cache)), None)
+
+    async def _fetch_iframe(self, iframe_url: str):
+        """Fetch an iframe page once for every concurrent caller, reusing it for a few seconds."""
+        cls = LiveTVExtractor
+        now = time.monotonic()
+        entry = cls._iframe_cache.get(iframe_url)
+        if entry is None or now - entry[1] >= cls._iframe_cache_ttl:
+            future = asyncio.ensure_future(self._make_request(iframe_url))
+
+            def _drop_failed(fut, key=iframe_url):
+                # Failures are not cached; retrieving the exception also silences
+                # "never retrieved" warnings when every waiter was cancelled
+                if fut.cancelled() or fut.exception() is not None:
+                    if cls._iframe_cache.get(key, (None,))[0] is fut:
+                        cls._iframe_cache.pop(key, None)
+
+            future.add_done_callback(_drop_failed)
+            cls._prune_iframe_cache(now)
+            entry = cls._iframe_cache[iframe_url] = (future, now)
+        # Shielded: a cancelled waiter (see extract) must not cancel the shared fetch
+        return await asyncio.shield(entry[0])
 
     async def extract(self, url: str, stream_title: str = None, **kwargs) -> dict:
         """Extract LiveTV URL and required headers."""
@@ -25,7 +84,7 @@ class LiveTVExtractor(BaseExtractor):
             resp = await self._make_request(url)
             response_text = resp.text
             
-            self.base_headers["referer"] = urljoin(url, "/")
+            request_headers = {**self.base_headers, "referer": urljoin(url, "/")}
 
             # Extract player API details
             player_api_base, method = await self._extract_player_api_base(response_text)
@@ -37,25 +96,29 @@ class LiveTVExtractor(BaseExtractor):
             if not options_data:
                 raise ExtractorError("No player options found")
 
-            # Process player options to find matching stream
-            for option in options_data:
-                current_title = option.get("title")
-                if stream_title and current_title != stream_title:
-                    continue
-
-                # Get stream URL based on player option
-                stream_data = await self._process_player_option(
+            # Resolve all matching player options concurrently; first usable stream wins
+            tasks = [
+                asyncio.create_task(self._process_player_option(
                     player_api_base, method, option.get("post"), option.get("nume"), option.get("type")
-                )
+                ))
+                for option in options_data
+                if not stream_title or option.get("title") == stream_title
+            ]
+            last_error = None
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    try:
+                        stream_data = await next_done
+                    except ExtractorError as e:
+                        last_error = e
+                        continue
 
-                if stream_data:
-                    stream_url = stream_data.get("url")
-                    if not stream_url:
+                    if not stream_data or not stream_data.get("url"):
                         continue
 
                     result = {
-                        "destination_url": stream_url,
-                        "request_headers": self.base_headers,
+                        "destination_url": stream_data["url"],
+                        "request_headers": request_headers,
                         "mediaflow_endpoint": self.mediaflow_endpoint,
                     }
 
@@ -71,7 +134,12 @@ class LiveTVExtractor(BaseExtractor):
                             })
 
                     return result
+            finally:
+                for task in tasks:
+                    task.cancel()
 
+            if last_error:
+                raise last_error
             raise ExtractorError("No valid stream found")
 
         except Exception as e:
@@ -79,8 +147,7 @@ class LiveTVExtractor(BaseExtractor):
 
     async def _extract_player_api_base(self, html_content: str):
         """Extract player API base URL and method."""
-        admin_ajax_pattern = r'"player_api"\s*:\s*"([^"]+)".*?"play_method"\s*:\s*"([^"]+)"'
-        match = re.search(admin_ajax_pattern, html_content)
+        match = _ADMIN_AJAX_RE.search(html_content)
         if not match:
             return None, None
         url = match.group(1).replace("\\/", "/")
@@ -92,12 +159,26 @@ class LiveTVExtractor(BaseExtractor):
 
     async def _get_player_options(self, html_content: str) -> list:
         """Extract player options from HTML content."""
-        pattern = r'<li[^>]*class=["\']dooplay_player_option["\'][^>]*data-type=["\']([^"\']*)["\'][^>]*data-post=["\']([^"\']*)["\'][^>]*data-nume=["\']([^"\']*)["\'][^>]*>.*?<span class=["\']title["\']>([^<]*)</span>'
-        matches = re.finditer(pattern, html_content, re.DOTALL)
-        return [
-            {"type": match.group(1), "post": match.group(2), "nume": match.group(3), "title": match.group(4).strip()}
-            for match in matches
-        ]
+        options = []
+        pos = html_content.find(_OPTION_MARKER)
+        while pos != -1:
+            next_pos = html_content.find(_OPTION_MARKER, pos + len(_OPTION_MARKER))
+            start = html_content.rfind("<li", 0, pos)
+            if start != -1:
+                # The option's <li> and title span, never past the next option
+                end = pos + _OPTION_WINDOW if next_pos == -1 else min(next_pos, pos + _OPTION_WINDOW)
+                window = html_content[start:end]
+                tag = _PLAYER_OPTION_TAG_RE.match(window)
+                title = _OPTION_TITLE_RE.search(window, tag.end()) if tag else None
+                if title:
+                    options.append({
+                        "type": tag.group(1),
+                        "post": tag.group(2),
+                        "nume": tag.group(3),
+                        "title": title.group(1).strip(),
+                    })
+            pos = next_pos
+        return options
 
     async def _process_player_option(self, api_base: str, method: str, post: str, nume: str, type_: str) -> dict:
         """Process player option to get stream URL."""
@@ -108,41 +189,41 @@ class LiveTVExtractor(BaseExtractor):
             resp = await self._make_request(api_url)
             data = resp.json
         else:
-            form_data = FormData()
-            form_data.add_field("action", "doo_player_ajax")
-            form_data.add_field("post", post)
-            form_data.add_field("nume", nume)
-            form_data.add_field("type", type_)
-            resp = await self._make_request(api_base, method="POST", data=form_data)
+            # Pre-encoded body: also safe to resend when _make_request retries
+            body = urlencode({"action": "doo_player_ajax", "post": post, "nume": nume, "type": type_}).encode()
+            resp = await self._make_request(
+                api_base,
+                method="POST",
+                data=body,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+            )
             data = resp.json
 
         # Get iframe URL from API response
         try:
-            iframe_url = urljoin(api_base, data.get("embed_url", "").replace("\\/", "/"))
+            iframe_url = resolve_url(api_base, data.get("embed_url", "").replace("\\/", "/"))
 
             # Get stream URL from iframe
-            resp_iframe = await self._make_request(iframe_url)
+            resp_iframe = await self._fetch_iframe(iframe_url)
             iframe_text = resp_iframe.text
-            iframe_headers = resp_iframe.headers
-            
-            stream_data = await self._extract_stream_url(iframe_text, iframe_headers, iframe_url)
+            content_type = resp_iframe.headers.get("content-type", "").lower()
+
+            stream_data = await self._extract_stream_url(iframe_text, content_type, iframe_url)
             return stream_data
 
         except Exception as e:
             raise ExtractorError(f"Failed to process player option: {str(e)}")
 
-    async def _extract_stream_url(self, iframe_text: str, iframe_headers: dict, iframe_url: str) -> dict:
+    async def _extract_stream_url(self, iframe_text: str, content_type: str, iframe_url: str) -> dict:
         """Extract final stream URL from iframe content."""
         try:
             # Parse URL components
             parsed_url = urlparse(iframe_url)
-            query_params = dict(param.split("=") for param in parsed_url.query.split("&") if "=" in param)
+            query_params = dict(parse_qsl(parsed_url.query, keep_blank_values=True))
 
             # Check if content is already a direct M3U8 stream
-            content_types = ["application/x-mpegurl", "application/vnd.apple.mpegurl"]
-            content_type = iframe_headers.get("content-type", "")
-
-            if any(ext in content_type.lower() for ext in content_types):
+            # Covers both application/x-mpegurl and application/vnd.apple.mpegurl
+            if "mpegurl" in content_type:
                 return {"url": iframe_url, "type": "m3u8"}
 
             stream_data = {}
@@ -150,7 +231,7 @@ class LiveTVExtractor(BaseExtractor):
             # Check for source parameter in URL
             if "source" in query_params:
                 stream_data = {
-                    "url": urljoin(iframe_url, unquote(query_params["source"])),
+                    "url": resolve_url(iframe_url, query_params["source"]),
                     "type": "m3u8",
                 }
 
@@ -172,14 +253,13 @@ class LiveTVExtractor(BaseExtractor):
 
                 if channel_id:
                     # Try channel ID specific pattern
-                    pattern = rf'{re.escape(channel_id)}["\']:\s*{{\s*["\']?url["\']?\s*:\s*["\']([^"\']+)["\']'
-                    match = re.search(pattern, iframe_text)
+                    match = _channel_url_pattern(channel_id).search(iframe_text)
                     if match:
                         stream_url = match.group(1)
 
                 # Try fallback patterns if channel ID pattern fails
                 if not stream_url:
-                    for pattern in [self.fallback_pattern, self.any_m3u8_pattern]:
+                    for pattern in (self.FALLBACK_PATTERN, self.ANY_M3U8_PATTERN):
                         match = pattern.search(iframe_text)
                         if match:
                             stream_url = match.group(1)
@@ -214,32 +294,25 @@ class LiveTVExtractor(BaseExtractor):
     async def _extract_drm_keys(self, html_content: str, channel_id: str) -> dict:
         """Extract DRM keys for MPD streams."""
         try:
-            # Pattern for channel entry
-            channel_pattern = rf'"{re.escape(channel_id)}":\s*{{[^}}]+}}'
-            channel_match = re.search(channel_pattern, html_content)
-
-            if channel_match:
-                channel_data = channel_match.group(0)
-
-                # Try clearkeys pattern first
-                clearkey_pattern = r'["\']?clearkeys["\']?\s*:\s*{\s*["\'](.+?)["\']:\s*["\'](.+?)["\']'
-                clearkey_match = re.search(clearkey_pattern, channel_data)
-
-                # Try k1/k2 pattern if clearkeys not found
-                if not clearkey_match:
-                    k1k2_pattern = r'["\']?k1["\']?\s*:\s*["\'](.+?)["\'],\s*["\']?k2["\']?\s*:\s*["\'](.+?)["\']'
-                    k1k2_match = re.search(k1k2_pattern, channel_data)
-
-                    if k1k2_match:
-                        return {"drm_key_id": k1k2_match.group(1), "drm_key": k1k2_match.group(2)}
-                else:
-                    return {"drm_key_id": clearkey_match.group(1), "drm_key": clearkey_match.group(2)}
+            # Channel entry: "<id>": { ... } up to the first closing brace
+            key = f'"{channel_id}":'
+            pos = html_content.find(key)
+            while pos != -1:
+                brace = pos + len(key)
+                while brace < len(html_content) and html_content[brace].isspace():
+                    brace += 1
+                if html_content.startswith("{", brace):
+                    end = html_content.find("}", brace + 1)
+                    if end > brace + 1:
+                        keys_match = _DRM_KEYS_RE.search(html_content, brace, end + 1)
+                        if keys_match:
+                            if keys_match.group("ck_id") is not None:
+                                return {"drm_key_id": keys_match.group("ck_id"), "drm_key": keys_match.group("ck")}
+                            return {"drm_key_id": keys_match.group("k1"), "drm_key": keys_match.group("k2")}
+                        return {}
+                pos = html_content.find(key, pos + 1)
 
             return {}
 
         except Exception:
             return {}
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
@@ -1,5 +1,13 @@
 import re
 from extractors.base import BaseExtractor, ExtractorError
+from utils.fast_re import compile_re
+
+_PACKED_RE = compile_re(
+    r"eval\(function\(p,a,c,k,e,d\)\{.*?\}\('(.*?)',(\d+|\[\]),(\d+),'(.*?)'\.split\('\|'\)",
+    re.DOTALL,
+)
+# See https://github.com/Gujal00/ResolveURL/blob/master/script.module.resolveurl/lib/resolveurl/plugins/lulustream.py
+_SOURCE_RE = compile_re(r"""sources:\s*\[{file:\s*["'](?P<url>[^"']+)""", re.DOTALL)
 
 class LuluStreamExtractor(BaseExtractor):
     """LuluStream URL extractor."""
@@ -13,11 +21,7 @@ class LuluStreamExtractor(BaseExtractor):
         text = resp.text
 
         # ponytail: unpack packed script if present, fallback to raw regex match
-        packed_match = re.search(
-            r"eval\(function\(p,a,c,k,e,d\)\{.*?\}\('(.*?)',(\d+|\[\]),(\d+),'(.*?)'\.split\('\|'\)",
-            text,
-            re.DOTALL,
-        )
+        packed_match = _PACKED_RE.search(text)
         if packed_match:
             try:
                 from utils.packed import unpack
@@ -25,21 +29,14 @@ class LuluStreamExtractor(BaseExtractor):
             except Exception:
                 pass
 
-        # See https://github.com/Gujal00/ResolveURL/blob/master/script.module.resolveurl/lib/resolveurl/plugins/lulustream.py
-        pattern = r"""sources:\s*\[{file:\s*["'](?P<url>[^"']+)"""
-        match = re.search(pattern, text, re.DOTALL)
+        match = _SOURCE_RE.search(text)
         if not match:
             raise ExtractorError("Failed to extract source URL")
         
         final_url = match.group(1)
 
-        self.base_headers["referer"] = url
         return {
             "destination_url": final_url,
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "referer": url},
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
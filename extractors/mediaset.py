@@ -14,9 +14,11 @@ from config import (
     ALL_PROXY_ERRORS,
     SELECTED_PROXY_CONTEXT,
     STRICT_PROXY_CONTEXT,
+    get_connector_for_proxy,
 )
 from extractors.base import BaseExtractor, ExtractorError
 from extractors.widevine import extract_widevine_pssh, resolve_widevine_device
+from utils.http_session import DEFAULT_USER_AGENT
 
 
 logger = logging.getLogger(__name__)
@@ -143,6 +145,13 @@ class MediasetExtractor(BaseExtractor):
             request_headers, proxies=proxies, extractor_name="mediaset"
         )
         self.mediaflow_endpoint = "mpd_manifest_proxy"
+        # Private WARP session used only by the retry below
+        self._retry_session = None
+
+    async def _get_session(self, url: str = None):
+        if self._retry_session is not None:
+            return self._retry_session
+        return await super()._get_session(url)
 
     async def extract(self, url: str, **kwargs) -> dict:
         parsed = urlparse(url)
@@ -174,10 +183,15 @@ class MediasetExtractor(BaseExtractor):
                 "retrying through a fresh WARP session",
                 error,
             )
-            if self.session and not self.session.closed:
-                await self.session.close()
+            # New connections through the tunnel, on a short-lived session
+            # of our own: the pooled WARP session stays up for everyone else
             self.session = None
-            self._session_proxy = None
+            self._retry_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=60, connect=30, sock_read=30),
+                connector=get_connector_for_proxy(_config.WARP_PROXY_URL),
+                headers={"User-Agent": DEFAULT_USER_AGENT},
+            )
+            self._session_proxy = _config.WARP_PROXY_URL
 
             selected_proxy_token = SELECTED_PROXY_CONTEXT.set(
                 _config.WARP_PROXY_URL
@@ -193,6 +207,9 @@ class MediasetExtractor(BaseExtractor):
             finally:
                 STRICT_PROXY_CONTEXT.reset(strict_proxy_token)
                 SELECTED_PROXY_CONTEXT.reset(selected_proxy_token)
+                await self._retry_session.close()
+                self._retry_session = None
+                self._session_proxy = None
 
         clearkey = ",".join(
             f"{kid}:{key}" for kid, key in resolved["keys"].items()
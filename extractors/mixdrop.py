@@ -2,19 +2,26 @@ import asyncio
 import logging
 import re
 import time
+from html import unescape
 from urllib.parse import urlparse, urljoin
 
 from curl_cffi.requests import AsyncSession
-from bs4 import BeautifulSoup
 
 from config import (
     get_preferred_proxy_for_url,
 )
 import config as _cfg
 from utils.cookie_cache import CookieCache
+from utils.fast_re import compile_re
 
 logger = logging.getLogger(__name__)
 
+# Packer arguments: }('payload',radix,count,'k|e|y'.split('|')
+# Negated classes (escapes allowed in the payload) instead of greedy .*
+_PACKED_ARGS_RE = compile_re(r"\}\('((?:[^'\\]|\\.)*)',(\d+),(\d+),'([^']*)'\.split\('\|'\)")
+# First embed iframe (/e/... or /emb...) on a mirror page
+_EMBED_IFRAME_RE = compile_re(r'<iframe\b[^>]*?\bsrc=["\']([^"\']*(?:/e/|/emb)[^"\']*)["\']', re.I)
+
 class ExtractorError(Exception):
     pass
 
@@ -51,7 +58,10 @@ class MixdropExtractor:
 
     def _unpack(self, packed_js: str) -> str:
         try:
-            match = re.search(r'}\(\'(.*)\',(\d+),(\d+),\'(.*)\'\.split\(\'\|\'\)', packed_js)
+            # The argument list follows the last "}('" (quotes inside the payload are escaped)
+            match = _PACKED_ARGS_RE.search(packed_js, max(packed_js.rfind("}('"), 0))
+            if not match:
+                match = _PACKED_ARGS_RE.search(packed_js)
             if not match:
                 match = re.search(r'\}\(([\s\S]*?),\s*(\d+),\s*(\d+),\s*\'([\s\S]*?)\'\.split\(\'\|\'\)', packed_js)
             if not match: return packed_js
@@ -150,10 +160,9 @@ class MixdropExtractor:
                                 if v_url.startswith("//"): v_url = "https:" + v_url
                                 return self._build_result(v_url, final_url, ua_res, cookies=cookies)
 
-                        soup = BeautifulSoup(html, "lxml")
-                        iframe = soup.find("iframe", src=re.compile(r'/e/|/emb', re.I))
+                        iframe = _EMBED_IFRAME_RE.search(html)
                         if iframe:
-                            iframe_url = urljoin(final_url, iframe["src"])
+                            iframe_url = urljoin(final_url, unescape(iframe.group(1)))
                             return await solve_url(iframe_url, depth + 1)
 
                         return None
@@ -1,6 +1,12 @@
-import json
-from bs4 import BeautifulSoup, SoupStrainer
-from extractors.base import BaseExtractor, ExtractorError
+import html
+from extractors.base import BaseExtractor, ExtractorError, json_loads
+from utils.fast_re import compile_re
+
+# data-options of the OKVideo <div>, with the two attributes in either order
+_OKVIDEO_OPTIONS_RE = compile_re(
+    rb'<div\b[^>]*?\bdata-(?:module=["\']OKVideo["\'][^>]*?\bdata-options=(?:"([^"]*)"|\'([^\']*)\')'
+    rb'|options=(?:"([^"]*)"|\'([^\']*)\')[^>]*?\bdata-module=["\']OKVideo["\'])'
+)
 
 class OkruExtractor(BaseExtractor):
     """Okru (ok.ru) URL extractor."""
@@ -10,34 +16,23 @@ class OkruExtractor(BaseExtractor):
 
     async def extract(self, url: str, **kwargs) -> dict:
         """Extract Okru URL."""
-        resp = await self._make_request(url)
-        text = resp.text
+        # Stop reading the page as soon as the player div has gone by
+        resp = await self._make_request(url, pattern=_OKVIDEO_OPTIONS_RE)
+        if not resp.match:
+            raise ExtractorError("Failed to find video element")
 
-        soup = BeautifulSoup(text, "lxml", parse_only=SoupStrainer("div"))
-        if soup:
-            div = soup.find("div", {"data-module": "OKVideo"})
-            if not div:
-                raise ExtractorError("Failed to find video element")
-            
-            data_options = div.get("data-options")
-            data = json.loads(data_options)
-            metadata = json.loads(data["flashvars"]["metadata"])
-            final_url = (
-                metadata.get("hlsMasterPlaylistUrl") or metadata.get("hlsManifestUrl") or metadata.get("ondemandHls")
-            )
-            
-            if not final_url:
-                raise ExtractorError("Failed to extract stream URL from metadata")
-            
-            self.base_headers["referer"] = url
-            return {
-                "destination_url": final_url,
-                "request_headers": self.base_headers,
-                "mediaflow_endpoint": self.mediaflow_endpoint,
-            }
+        data_options = next(group for group in resp.match.groups() if group is not None)
+        data = json_loads(html.unescape(data_options.decode("utf-8")))
+        metadata = json_loads(data["flashvars"]["metadata"])
+        final_url = (
+            metadata.get("hlsMasterPlaylistUrl") or metadata.get("hlsManifestUrl") or metadata.get("ondemandHls")
+        )
         
-        raise ExtractorError("Failed to parse OK.ru page")
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        if not final_url:
+            raise ExtractorError("Failed to extract stream URL from metadata")
+        
+        return {
+            "destination_url": final_url,
+            "request_headers": {**self.base_headers, "referer": url},
+            "mediaflow_endpoint": self.mediaflow_endpoint,
+        }
@@ -128,7 +128,7 @@ class Sports99Extractor(BaseExtractor):
             # Create replacement map from string n
             repl_map = {n[j]: str(j) for j in range(len(n))}
             
-            result = ""
+            chars = []
             parts = h.split(sep)
             for s in parts:
                 if not s:
@@ -142,10 +142,11 @@ class Sports99Extractor(BaseExtractor):
                 # Base conversion (base e to decimal)
                 try:
                     num = int(temp_s, e)
-                    result += chr(num - t)
+                    chars.append(chr(num - t))
                 except ValueError:
                     continue
-            
+            result = "".join(chars)
+
             # Handle potential double encoding (decodeURIComponent(escape(r)))
             try:
                 return urllib.parse.unquote(result.encode('latin-1').decode('utf-8', errors='ignore'))
@@ -195,7 +196,3 @@ class Sports99Extractor(BaseExtractor):
         except Exception as err:
             logger.error(f"[Sports99] URL extraction error: {err}")
             return None
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
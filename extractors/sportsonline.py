@@ -6,11 +6,10 @@ import json
 import ssl
 from urllib.parse import urlparse, urljoin
 from typing import Dict, Any
-import random
 import aiohttp
 from aiohttp import ClientSession, ClientTimeout, TCPConnector
 from aiohttp.client_exceptions import ClientOSError
-from config import get_connector_for_proxy, get_preferred_proxy_for_url
+from config import get_connector_for_proxy, get_preferred_proxy_for_url, next_round_robin_proxy
 import config as _cfg
 
 
@@ -70,7 +69,7 @@ class SportsonlineExtractor:
         self._session_proxy = None
 
     def _get_random_proxy(self):
-        return random.choice(self.proxies) if self.proxies else None
+        return next_round_robin_proxy(self.proxies)
 
     def update_request_headers(self, request_headers: dict | None):
         self.request_headers = request_headers or {}
@@ -162,6 +161,8 @@ class SportsonlineExtractor:
             if not proxy and not url:
                 proxy = self._get_random_proxy()
 
+        # Private session: the page -> iframe -> player flow relies on the
+        # cookies it collects, which must not leak into other extractions
         if (
             self.session is None
             or self.session.closed
@@ -174,9 +175,9 @@ class SportsonlineExtractor:
 
             if proxy:
                 logger.debug(f"Using proxy {proxy} for Sportsonline session.")
-                connector = get_connector_for_proxy(proxy)
+                connector = get_connector_for_proxy(proxy, limit=20, limit_per_host=10)
             else:
-                connector = TCPConnector(limit=0, limit_per_host=0)
+                connector = TCPConnector(limit=20, limit_per_host=10)
 
             self.session = ClientSession(
                 timeout=timeout,
@@ -208,10 +209,6 @@ class SportsonlineExtractor:
                 logger.warning(f"SSL/OS error attempt {attempt + 1} for {url}: {str(e)}")
                 if self._session_proxy:
                     logger.info(f"SSL/OS error with proxy {self._session_proxy}, retrying direct...")
-                    if self.session and not self.session.closed:
-                        await self.session.close()
-                    self.session = None
-                    self._session_proxy = None
                     session = await self._get_session(url, force_direct=True)
                     try:
                         async with session.get(url, headers=final_headers, timeout=timeout) as response:
@@ -82,7 +82,3 @@ class StreamHGExtractor(BaseExtractor):
                 continue
 
         raise ExtractorError(f"STREAMHG extraction failed for {url}")
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
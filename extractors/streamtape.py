@@ -34,13 +34,8 @@ class StreamtapeExtractor(BaseExtractor):
         if not final_url:
             raise ExtractorError("Streamtape URL extraction failed")
 
-        self.base_headers["referer"] = url
         return {
             "destination_url": final_url,
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "referer": url},
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
@@ -3,7 +3,11 @@ from urllib.parse import urljoin, urlparse
 from extractors.base import BaseExtractor, ExtractorError
 from utils.packed import eval_solver
 
-from extractors.base import BaseExtractor, ExtractorError
+from extractors.base import BaseExtractor, ExtractorError, resolve_url
+from utils.fast_re import compile_re
+
+_M3U8_RE = compile_re(rb'https?://[^"\'\s]+\.m3u8[^"\'\s]*')
+_IFRAME_SRC_RE = compile_re(rb'<iframe[^>]+src=["\']([^"\']+)["\']', re.DOTALL)
 
 class StreamWishExtractor(BaseExtractor):
     """StreamWish URL extractor."""
@@ -12,10 +16,10 @@ class StreamWishExtractor(BaseExtractor):
         super().__init__(request_headers, proxies, extractor_name="streamwish")
 
     @staticmethod
-    def _extract_m3u8(text: str) -> str | None:
-        """Extract first absolute m3u8 URL from text"""
-        match = re.search(r'https?://[^"\'\s]+\.m3u8[^"\'\s]*', text)
-        return match.group(0) if match else None
+    def _extract_m3u8(body: bytes) -> str | None:
+        """Extract first absolute m3u8 URL from an undecoded page body"""
+        match = _M3U8_RE.search(body)
+        return match.group(0).decode("utf-8", "replace") if match else None
 
     async def extract(self, url: str, **kwargs) -> dict:
         """Extract StreamWish URL."""
@@ -26,18 +30,18 @@ class StreamWishExtractor(BaseExtractor):
 
         headers = {"Referer": referer}
         
-        resp = await self._make_request(url, headers=headers)
-        text = resp.text
+        # Only the first iframe src is needed: stop reading once it has arrived
+        resp = await self._make_request(url, headers=headers, pattern=_IFRAME_SRC_RE)
+        iframe_match = resp.match
+        iframe_url = resolve_url(url, iframe_match.group(1).decode("utf-8")) if iframe_match else url
 
-        iframe_match = re.search(r'<iframe[^>]+src=["\']([^"\']+)["\']', text, re.DOTALL)
-        iframe_url = urljoin(url, iframe_match.group(1)) if iframe_match else url
+        # Scanned as bytes: the page is never decoded on the fast path
+        resp_iframe = await self._make_request(iframe_url, headers=headers, raw=True)
+        body = resp_iframe.text
 
-        resp_iframe = await self._make_request(iframe_url, headers=headers)
-        html = resp_iframe.text
+        final_url = self._extract_m3u8(body)
 
-        final_url = self._extract_m3u8(html)
-
-        if not final_url and "eval(function(p,a,c,k,e,d)" in html:
+        if not final_url and b"eval(function(p,a,c,k,e,d)" in body:
             try:
                 final_url = await eval_solver(
                     await self._get_session(iframe_url),
@@ -59,18 +63,11 @@ class StreamWishExtractor(BaseExtractor):
         if final_url.startswith("/"):
             final_url = urljoin(iframe_url, final_url)
 
-        origin = f"{urlparse(referer).scheme}://{urlparse(referer).netloc}"
-        self.base_headers.update({
-            "Referer": referer,
-            "Origin": origin,
-        })
+        ref_parsed = urlparse(referer)
+        origin = f"{ref_parsed.scheme}://{ref_parsed.netloc}"
 
         return {
             "destination_url": final_url,
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "Referer": referer, "Origin": origin},
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
@@ -19,9 +19,8 @@ class SupervideoExtractor(BaseExtractor):
         session = await self._get_session(url)
         final_url = await eval_solver(session, url, headers, patterns)
 
-        self.base_headers["referer"] = url
         return {
             "destination_url": final_url,
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "referer": url},
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
@@ -1,37 +1,46 @@
-import re
+import functools
 from urllib.parse import urljoin, urlparse
 from extractors.base import BaseExtractor, ExtractorError
+from utils.fast_re import compile_re
+
+# The closing quote is required: the page is scanned while it streams in, and
+# a chunk boundary must not be able to cut the captured URL short
+_MEDIA_URL_RE = compile_re(rb"(?:urlPlay|data-hash)\s*=\s*['\"]([^'\"]+)['\"]")
+# Absolute, protocol-relative and root-relative playlist URLs, in that order
+_PLAYLIST_URL_RES = tuple(compile_re(p) for p in (
+    r'https?://[^\'"\s]+\.m3u8(?:\?[^\'"\s]*)?',
+    r'//[^\'"\s]+\.m3u8(?:\?[^\'"\s]*)?',
+    r'/[^\'"\s]+\.m3u8(?:\?[^\'"\s]*)?',
+))
+
+# ParseResult is an immutable namedtuple, safe to share between callers
+_urlparse_cached = functools.lru_cache(maxsize=1024)(urlparse)
 
 class TurboVidPlayExtractor(BaseExtractor):
     """TurboVidPlay URL extractor."""
 
-    domains = [
+    domains = frozenset({
         "turboviplay.com",
         "emturbovid.com",
         "tuborstb.co",
         "javggvideo.xyz",
         "stbturbo.xyz",
         "turbovidhls.com",
-    ]
+    })
 
     def __init__(self, request_headers: dict, proxies: list = None):
         super().__init__(request_headers, proxies, extractor_name="turbovidplay")
 
     def _get_origin(self, url: str) -> str:
         """Get origin from URL."""
-        parsed = urlparse(url)
+        parsed = _urlparse_cached(url)
         return f"{parsed.scheme}://{parsed.netloc}"
 
     @staticmethod
     def _extract_playlist_url(text: str, base_url: str | None = None) -> str | None:
         """Extract an HLS playlist URL from either a manifest or inline script response."""
-        patterns = [
-            r'https?://[^\'"\s]+\.m3u8(?:\?[^\'"\s]*)?',
-            r'//[^\'"\s]+\.m3u8(?:\?[^\'"\s]*)?',
-            r'/[^\'"\s]+\.m3u8(?:\?[^\'"\s]*)?',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in _PLAYLIST_URL_RES:
+            match = pattern.search(text)
             if not match:
                 continue
 
@@ -45,17 +54,16 @@ class TurboVidPlayExtractor(BaseExtractor):
 
     async def extract(self, url: str, **kwargs) -> dict:
         """Extract TurboVidPlay URL."""
-        # 1. Load embed
-        resp = await self._make_request(url)
-        html = resp.text
+        # 1+2. Load embed, stopping as soon as urlPlay/data-hash has arrived so the
+        # playlist request starts without waiting for the rest of the page
+        resp = await self._make_request(url, pattern=_MEDIA_URL_RE)
         response_url = resp.url
 
-        # 2. Extract urlPlay or data-hash
-        m = re.search(r"(?:urlPlay|data-hash)\s*=\s*['\"]([^'\"]+)", html)
+        m = resp.match
         if not m:
             raise ExtractorError("TurboViPlay: No media URL found")
 
-        media_url = m.group(1)
+        media_url = m.group(1).decode("utf-8", "replace")
 
         # Normalize protocol
         origin = self._get_origin(response_url)
@@ -80,14 +88,8 @@ class TurboVidPlayExtractor(BaseExtractor):
             raise ExtractorError("TurboViPlay: Unable to extract playlist URL")
 
         # 5. Final headers
-        self.base_headers.update({"referer": url, "origin": origin})
-
         return {
             "destination_url": real_m3u8,
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "referer": url, "origin": origin},
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
@@ -94,7 +94,3 @@ class UqloadExtractor(BaseExtractor):
             },
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
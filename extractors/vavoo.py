@@ -2,7 +2,6 @@ import asyncio
 import base64
 import json
 import logging
-import random
 import re
 import socket
 import time
@@ -10,7 +9,7 @@ import uuid
 from aiohttp import ClientSession, ClientTimeout, TCPConnector
 from typing import Optional, Dict, Any
 from urllib.parse import urlparse, parse_qs
-from config import get_connector_for_proxy, BYPASS_PROXIES_CONTEXT
+from config import get_connector_for_proxy, BYPASS_PROXIES_CONTEXT, next_round_robin_proxy
 import config as _cfg
 
 logger = logging.getLogger(__name__)
@@ -69,7 +68,7 @@ class VavooExtractor:
                 return self.session
 
             if not bypass_proxies and self._proxy is None and self.proxies:
-                self._proxy = random.choice(self.proxies)
+                self._proxy = next_round_robin_proxy(self.proxies)
 
             timeout = ClientTimeout(total=60, connect=30, sock_read=30)
 
@@ -1,6 +1,21 @@
+import functools
 import re
 from urllib.parse import urlparse
 from extractors.base import BaseExtractor, ExtractorError
+from utils.fast_re import compile_re
+
+# Only the URL is captured; the "res" key just has to follow it within the
+# same source object. The gap is bounded so a miss can't rescan the page.
+_SOURCE_RE = compile_re(
+    rb"""\b(?:file|src)\s*["']?\s*[:=,]?\s*["']([^"']+)["']"""
+    rb"""[^}>\]]{0,512}?\bres\s*["']?\s*[:=]""",
+    re.IGNORECASE,
+)
+
+# ParseResult is an immutable namedtuple, safe to share between callers
+_urlparse_cached = functools.lru_cache(maxsize=1024)(urlparse)
+
+_VIDOZA_SUFFIXES = ("vidoza.net", "videzz.net")
 
 class VidozaExtractor(BaseExtractor):
     """Vidoza URL extractor."""
@@ -8,60 +23,50 @@ class VidozaExtractor(BaseExtractor):
     def __init__(self, request_headers: dict, proxies: list = None):
         super().__init__(request_headers, proxies, extractor_name="vidoza")
         self.mediaflow_endpoint = "proxy_stream_endpoint"
+        self._page_headers = {
+            **self.base_headers,
+            "referer": "https://vidoza.net/",
+            "accept": "*/*",
+            "accept-language": "en-US,en;q=0.9",
+        }
 
     async def extract(self, url: str, **kwargs) -> dict:
         """Extract Vidoza URL."""
-        parsed = urlparse(url)
+        parsed = _urlparse_cached(url)
 
         # Accept vidoza + videzz
-        if not parsed.hostname or not (
-            parsed.hostname.endswith("vidoza.net") or parsed.hostname.endswith("videzz.net")
-        ):
+        if not parsed.hostname or not parsed.hostname.endswith(_VIDOZA_SUFFIXES):
             raise ExtractorError("VIDOZA: Invalid domain")
 
-        headers = self.base_headers.copy()
-        headers.update({
-            "referer": "https://vidoza.net/",
-            "accept": "*/*",
-            "accept-language": "en-US,en;q=0.9",
-        })
+        # Fresh copy: it is returned to the caller and may get a cookie below
+        headers = dict(self._page_headers)
 
         # 1) Fetch the embed page
-        resp = await self._make_request(url, headers=headers)
+        # Raw bytes: the regex runs on the undecoded page
+        resp = await self._make_request(url, headers=headers, raw=True)
         html = resp.text
-        cookies = {k: v.value for k, v in resp.cookies.items()}
 
         if not html:
             raise ExtractorError("VIDOZA: Empty HTML from Vidoza")
 
         # 2) Extract final link with REGEX
-        pattern = re.compile(
-            r"""["']?\s*(?:file|src)\s*["']?\s*[:=,]?\s*["'](?P<url>[^"']+)"""
-            r"""(?:[^}>\]]+)["']?\s*res\s*["']?\s*[:=]\s*["']?(?P<label>[^"',]+)""",
-            re.IGNORECASE,
-        )
-
-        match = pattern.search(html)
+        match = _SOURCE_RE.search(html)
         if not match:
             raise ExtractorError("VIDOZA: Unable to extract video + label from JS")
 
-        mp4_url = match.group("url")
-        # label = match.group("label").strip()  # available but not used
+        mp4_url = match.group(1).decode("utf-8", "replace")
 
         # Fix URLs like //str38.vidoza.net/...
         if mp4_url.startswith("//"):
             mp4_url = "https:" + mp4_url
 
         # 3) Attach cookies (token may depend on these)
-        if cookies:
-            headers["cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        # Serialized straight from the response's morsels, once
+        if resp.cookies:
+            headers["cookie"] = "; ".join(f"{m.key}={m.value}" for m in resp.cookies.values())
 
         return {
             "destination_url": mp4_url,
             "request_headers": headers,
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
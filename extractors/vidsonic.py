@@ -96,7 +96,3 @@ class VidSonicExtractor(BaseExtractor):
             "request_headers": {},
             "mediaflow_endpoint": self.mediaflow_endpoint,
         }
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
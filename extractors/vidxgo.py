@@ -12,9 +12,10 @@ import re
 import time
 from urllib.parse import urlparse, parse_qs
 
-from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from aiohttp import ClientTimeout
 
-from config import get_connector_for_proxy, get_ordered_proxies_for_url, should_allow_direct_fallback
+from config import get_ordered_proxies_for_url, should_allow_direct_fallback
+from utils.http_session import get_shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +58,8 @@ _CURRENT_SRC_RE = re.compile(
 # All <script> tags, capturing their inner contents.
 _SCRIPT_TAG_RE = re.compile(r"<script[^>]*>(.*?)</script>", re.S | re.I)
 
+_FETCH_TIMEOUT = ClientTimeout(total=25, connect=10, sock_read=20)
+
 
 class VidXgoExtractor:
     """VidXgo embed -> HLS extractor with auto-refresh manifest."""
@@ -120,15 +123,14 @@ class VidXgoExtractor:
             paths.append(None)
         last_error = None
         for proxy in paths:
-            timeout = ClientTimeout(total=25, connect=10, sock_read=20)
-            connector = get_connector_for_proxy(proxy) if proxy else TCPConnector(ssl=False)
+            # Pooled session per proxy: no new connector/TLS handshake per fetch
+            session = get_shared_session(proxy)
             try:
-                async with ClientSession(timeout=timeout, connector=connector) as session:
-                    async with session.get(url, headers=headers, ssl=False) as resp:
-                        resp.raise_for_status()
-                        text = await resp.text()
-                        self.selected_proxy = proxy
-                        return text
+                async with session.get(url, headers=headers, ssl=False, timeout=_FETCH_TIMEOUT) as resp:
+                    resp.raise_for_status()
+                    text = await resp.text()
+                    self.selected_proxy = proxy
+                    return text
             except Exception as e:
                 last_error = e
                 logger.debug(f"vidxgo fetch failed via {proxy or 'direct'}: {e}")
@@ -258,5 +260,5 @@ class VidXgoExtractor:
         return result
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        # Sessions belong to the shared pool (utils.http_session)
+        self.session = None
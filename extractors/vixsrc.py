@@ -2,7 +2,6 @@ import asyncio
 import json
 import logging
 import os
-import random
 import re
 import threading
 import time
@@ -11,8 +10,9 @@ from urllib.parse import parse_qs, parse_qsl, unquote, urlencode, urljoin, urlpa
 
 import aiohttp
 from aiohttp import ClientSession, ClientTimeout, TCPConnector
-from config import WARP_PROXY_URL, get_connector_for_proxy, SELECTED_PROXY_CONTEXT, STRICT_PROXY_CONTEXT, get_solver_proxy_url, get_extractor_proxies, get_ordered_proxies_for_url, should_allow_direct_fallback, mark_proxy_dead, DEAD_PROXIES, _proxy_lock, ALL_PROXY_ERRORS
+from config import WARP_PROXY_URL, get_connector_for_proxy, SELECTED_PROXY_CONTEXT, STRICT_PROXY_CONTEXT, get_solver_proxy_url, get_extractor_proxies, get_ordered_proxies_for_url, should_allow_direct_fallback, mark_proxy_dead, DEAD_PROXIES, _proxy_lock, ALL_PROXY_ERRORS, next_round_robin_proxy
 import config as _cfg
+from utils.http_session import get_shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -56,10 +56,9 @@ class VixSrcExtractor:
             return
         try:
             timeout = ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(VIXSRC_CONFIG_URL) as response:
-                    response.raise_for_status()
-                    config = await response.json(content_type=None)
+            async with get_shared_session().get(VIXSRC_CONFIG_URL, timeout=timeout) as response:
+                response.raise_for_status()
+                config = await response.json(content_type=None)
             domain = str(config.get("vixsrc", "")).strip().lower()
             if domain:
                 _vixsrc_domain = domain.removeprefix("https://").removeprefix("http://").rstrip("/")
@@ -295,7 +294,7 @@ class VixSrcExtractor:
 
     def _get_random_proxy(self):
         """Restituisce un proxy casuale dalla lista."""
-        return random.choice(self.proxies) if self.proxies else None
+        return next_round_robin_proxy(self.proxies)
 
     def _build_session_for_proxy(self, proxy: str | None) -> ClientSession:
         timeout = ClientTimeout(total=60, connect=30, sock_read=30)
@@ -7,6 +7,11 @@ from extractors.base import BaseExtractor, ExtractorError
 
 logger = logging.getLogger(__name__)
 
+_ROT13 = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
+    "NOPQRSTUVWXYZABCDEFGHIJKLMnopqrstuvwxyzabcdefghijklm",
+)
+
 class VoeExtractor(BaseExtractor):
     def __init__(self, request_headers: dict, proxies: list = None):
         super().__init__(request_headers, proxies, extractor_name="voe")
@@ -63,10 +68,9 @@ class VoeExtractor(BaseExtractor):
                     final_url = result.get('source') or result.get('direct_access_url') or result.get('file')
                     if final_url:
                         logger.info("VOE: successfully extracted URL via Method 8")
-                        self.base_headers["referer"] = url
                         return {
                             "destination_url": final_url,
-                            "request_headers": self.base_headers,
+                            "request_headers": {**self.base_headers, "referer": url},
                             "mediaflow_endpoint": "hls_proxy",
                         }
 
@@ -78,10 +82,9 @@ class VoeExtractor(BaseExtractor):
                     final_url = result.get('source') or result.get('direct_access_url') or result.get('file')
                     if final_url:
                         logger.info("VOE: successfully extracted URL via Method 7")
-                        self.base_headers["referer"] = url
                         return {
                             "destination_url": final_url,
-                            "request_headers": self.base_headers,
+                            "request_headers": {**self.base_headers, "referer": url},
                             "mediaflow_endpoint": "hls_proxy",
                         }
 
@@ -93,10 +96,9 @@ class VoeExtractor(BaseExtractor):
                     final_url = result.get('source') or result.get('direct_access_url') or result.get('file')
                     if final_url:
                         logger.info("VOE: successfully extracted URL via Method 6")
-                        self.base_headers["referer"] = url
                         return {
                             "destination_url": final_url,
-                            "request_headers": self.base_headers,
+                            "request_headers": {**self.base_headers, "referer": url},
                             "mediaflow_endpoint": "hls_proxy",
                         }
 
@@ -115,20 +117,18 @@ class VoeExtractor(BaseExtractor):
             m = re.search(r"var\s+source\s*=\s*'([^']+)'", combined_text)
             if m:
                 final_url = m.group(1)
-                self.base_headers["referer"] = url
                 return {
                     "destination_url": final_url,
-                    "request_headers": self.base_headers,
+                    "request_headers": {**self.base_headers, "referer": url},
                     "mediaflow_endpoint": "hls_proxy",
                 }
             # Check for hls source
             m = re.search(r"""hls['"]:\s*['"]([^'"]+)""", combined_text)
             if m:
                 final_url = m.group(1)
-                self.base_headers["referer"] = url
                 return {
                     "destination_url": final_url,
-                    "request_headers": self.base_headers,
+                    "request_headers": {**self.base_headers, "referer": url},
                     "mediaflow_endpoint": "hls_proxy",
                 }
 
@@ -151,25 +151,15 @@ class VoeExtractor(BaseExtractor):
         if not final_url:
             raise ExtractorError("VOE: failed to extract video URL")
 
-        self.base_headers["referer"] = url
         return {
             "destination_url": final_url,
-            "request_headers": self.base_headers,
+            "request_headers": {**self.base_headers, "referer": url},
             "mediaflow_endpoint": "hls_proxy",
         }
 
     @staticmethod
     def _rot13(text: str) -> str:
-        out = []
-        for ch in text:
-            o = ord(ch)
-            if 65 <= o <= 90:
-                out.append(chr(((o - 65 + 13) % 26) + 65))
-            elif 97 <= o <= 122:
-                out.append(chr(((o - 97 + 13) % 26) + 97))
-            else:
-                out.append(ch)
-        return ''.join(out)
+        return text.translate(_ROT13)
 
     @staticmethod
     def _safe_b64_decode(s: str) -> str:
@@ -236,22 +226,11 @@ class VoeExtractor(BaseExtractor):
 
     @staticmethod
     def voe_decode(ct: str, luts: str) -> dict:
-        lut = [''.join([('\\' + x) if x in '.*+?^${}()|[]\\' else x for x in i]) for i in luts[2:-2].split("','")]
-        txt = ''
-        for i in ct:
-            x = ord(i)
-            if 64 < x < 91:
-                x = (x - 52) % 26 + 65
-            elif 96 < x < 123:
-                x = (x - 84) % 26 + 97
-            txt += chr(x)
-        for i in lut:
-            txt = re.sub(i, '', txt)
+        # The LUT entries are literal strings: plain replace, no per-entry regex
+        txt = ct.translate(_ROT13)
+        for i in luts[2:-2].split("','"):
+            txt = txt.replace(i, '')
         ct = base64.b64decode(txt).decode('utf-8')
         txt = ''.join([chr(ord(i) - 3) for i in ct])
         txt = base64.b64decode(txt[::-1]).decode('utf-8')
         return json.loads(txt)
-
-    async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
\ No newline at end of file
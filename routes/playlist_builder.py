@@ -3,9 +3,11 @@ import logging
 import json
 import base64
 import urllib.parse
-from aiohttp import ClientSession, ClientTimeout
+from aiohttp import ClientTimeout
 from typing import Iterator, List, Dict
 
+from utils.http_session import get_shared_session
+
 logger = logging.getLogger(__name__)
 
 class PlaylistBuilder:
@@ -161,11 +163,11 @@ class PlaylistBuilder:
         lines = []
         try:
             timeout = ClientTimeout(total=30, connect=10)
-            async with ClientSession(timeout=timeout) as client:
-                async with client.get(url, headers=headers) as response:
-                    response.raise_for_status()
-                    content = await response.text()
-                    lines = [line + '\n' if line else '' for line in content.split('\n')]
+            # Pooled direct session: repeated playlist refreshes reuse connections
+            async with get_shared_session().get(url, headers=headers, timeout=timeout) as response:
+                response.raise_for_status()
+                content = await response.text()
+                lines = [line + '\n' if line else '' for line in content.split('\n')]
         except Exception as e:
             logger.error(f"Error downloading playlist (async): {str(e)}")
             raise
@@ -1,8 +1,10 @@
+import asyncio
 import json
 import logging
 import os
 from aiohttp import web
 import functools
+import hashlib
 import shutil
 
 import config
@@ -11,6 +13,34 @@ import config_store
 
 logger = logging.getLogger(__name__)
 
+# Chunk letti dal file di una registrazione attiva: 1 MiB ammortizza syscall
+# e risvegli dell'event loop (una read corta restituisce comunque solo i
+# byte disponibili, quindi la latenza sulla coda del file non cambia)
+_LIVE_CHUNK_SIZE = 1 << 20
+
+
+_CONTENT_TYPES = {
+    '.mp4': "video/mp4",
+    '.mkv': "video/x-matroska",
+}
+
+
+def _content_type(file_path):
+    """Content type from the file extension; recordings default to MPEG-TS."""
+    return _CONTENT_TYPES.get(os.path.splitext(file_path)[1].lower(), "video/mp2t")
+
+
+def _open_sequential(file_path):
+    """Open a file read-only, hinting the kernel that it is read once, front to back."""
+    fd = os.open(file_path, os.O_RDONLY)
+    if hasattr(os, 'posix_fadvise'):  # Linux/BSD only
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_NOREUSE)
+        except OSError:
+            pass
+    return fd
+
 
 def setup_recording_routes(app, recording_manager):
     """Setup all recording-related routes."""
@@ -23,51 +53,79 @@ def setup_recording_routes(app, recording_manager):
             return await handler(*args, **kwargs)
         return wrapper
 
+    def auth_required(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            # Checked once here, before the handler parses any body/query
+            if not check_password(request):
+                return web.json_response({"error": "Unauthorized"}, status=401)
+            return await handler(request)
+        return wrapper
+
+    recordings_dir = os.path.abspath(recording_manager.recordings_dir)
+
+    def is_inside_recordings_dir(file_path):
+        """Path containment check (a plain prefix test would accept /rec_evil for /rec)."""
+        try:
+            return os.path.commonpath([os.path.abspath(file_path), recordings_dir]) == recordings_dir
+        except ValueError:  # Mix of absolute/relative or different drives
+            return False
+
+    # Il template viene letto una sola volta; le pagine renderizzate sono
+    # memorizzate per combinazione di valori dinamici (poche: versione/WARP)
+    template_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'templates', 'recordings.html'
+    )
+    try:
+        with open(template_path, 'r', encoding='utf-8') as f:
+            template = f.read().replace("{{APP_VERSION}}", APP_VERSION)
+    except FileNotFoundError:
+        template = None
+    rendered_pages = {}
+
     async def handle_recordings_page(request):
         """Serve the recordings UI page."""
         if not check_password(request):
             raise web.HTTPFound('/admin/login')
-        template_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            'templates', 'recordings.html'
-        )
-        try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            proxy = app.get('proxy')
-            latest_version = getattr(proxy, 'latest_version', 'Unknown') if proxy else 'Unknown'
-            warp_status = getattr(proxy, 'warp_status', 'Unknown') if proxy else 'Unknown'
+        if template is None:
+            return web.Response(text="Recordings template not found",
+                               status=404)
+        proxy = app.get('proxy')
+        latest_version = getattr(proxy, 'latest_version', 'Unknown') if proxy else 'Unknown'
+        warp_status = getattr(proxy, 'warp_status', 'Unknown') if proxy else 'Unknown'
+        key = (latest_version, warp_status)
+        page = rendered_pages.get(key)
+        if page is None:
             is_outdated = latest_version not in ["Checking...", "Unknown", "Error", APP_VERSION]
             version_status_class = "outdated" if is_outdated else ""
-            html_content = html_content.replace("{{APP_VERSION}}", APP_VERSION)
-            html_content = html_content.replace("{{LATEST_VERSION}}", latest_version)
+            html_content = template.replace("{{LATEST_VERSION}}", latest_version)
             html_content = html_content.replace("{{VERSION_STATUS_CLASS}}", version_status_class)
             html_content = html_content.replace("{{WARP_STATUS}}", warp_status)
-            return web.Response(text=html_content, content_type='text/html')
-        except FileNotFoundError:
-            return web.Response(text="Recordings template not found",
-                               status=404)
+            body = html_content.encode('utf-8')
+            page = rendered_pages[key] = (body, f'"{hashlib.md5(body).hexdigest()}"')
+        body, etag = page
+        # Pagina protetta da password: cache solo privata, rivalidata via ETag
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='text/html',
+                            charset='utf-8', headers=headers)
 
     async def handle_list_recordings(request):
         """GET /api/recordings - List all recordings."""
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         status = request.query.get('status')
         recordings = recording_manager.get_all_recordings(status=status)
         system_stats = config.get_system_stats()
 
         return web.json_response({
             "recordings": recordings,
-            "active_count": len([r for r in recordings if r.get('is_active')]),
+            "active_count": sum(1 for r in recordings if r.get('is_active')),
             "system_stats": system_stats
         })
 
     async def handle_get_recording(request):
         """GET /api/recordings/{id} - Get a specific recording."""
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recording_id = request.match_info['id']
         recording = recording_manager.get_recording(recording_id)
 
@@ -79,9 +137,6 @@ def setup_recording_routes(app, recording_manager):
 
     async def handle_start_recording(request):
         """POST /api/recordings/start - Start a new recording."""
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         try:
             data = await request.json()
         except json.JSONDecodeError:
@@ -130,9 +185,6 @@ def setup_recording_routes(app, recording_manager):
 
     async def handle_stop_recording(request):
         """POST /api/recordings/{id}/stop - Stop an active recording."""
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recording_id = request.match_info['id']
         success = await recording_manager.stop_recording(recording_id)
 
@@ -146,9 +198,6 @@ def setup_recording_routes(app, recording_manager):
 
     async def handle_delete_recording(request):
         """DELETE /api/recordings/{id} - Delete a recording."""
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recording_id = request.match_info['id']
         success = await recording_manager.delete_recording(recording_id)
 
@@ -163,9 +212,6 @@ def setup_recording_routes(app, recording_manager):
 
         Returns a simple video placeholder or redirect after deletion.
         """
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recording_id = request.match_info['id']
         success = await recording_manager.delete_recording(recording_id)
 
@@ -182,25 +228,26 @@ def setup_recording_routes(app, recording_manager):
 
     async def handle_delete_all_recordings(request):
         """DELETE /api/recordings - Delete all recordings."""
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recordings = recording_manager.get_all_recordings()
-        deleted = 0
-        for rec in recordings:
-            try:
-                await recording_manager.delete_recording(rec['id'])
-                deleted += 1
-            except Exception as e:
-                logger.warning(f"Failed to delete recording {rec['id']}: {e}")
+        # Concurrent, but bounded: stopping active ones waits on FFmpeg
+        sem = asyncio.Semaphore(16)
+
+        async def delete_one(recording_id):
+            async with sem:
+                try:
+                    await recording_manager.delete_recording(recording_id)
+                    return True
+                except Exception as e:
+                    logger.warning(f"Failed to delete recording {recording_id}: {e}")
+                    return False
+
+        results = await asyncio.gather(*(delete_one(rec['id']) for rec in recordings))
+        deleted = sum(results)
 
         return web.json_response({"success": True, "deleted": deleted})
 
     async def handle_download_recording(request):
         """GET /api/recordings/{id}/download - Download a recording file."""
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recording_id = request.match_info['id']
         recording = recording_manager.get_recording(recording_id)
 
@@ -214,19 +261,12 @@ def setup_recording_routes(app, recording_manager):
                                     status=404)
 
         # Security check
-        recordings_dir = os.path.abspath(recording_manager.recordings_dir)
-        file_abs = os.path.abspath(file_path)
-        if not file_abs.startswith(recordings_dir):
+        if not is_inside_recordings_dir(file_path):
             return web.json_response({"error": "Access denied"}, status=403)
 
         filename = os.path.basename(file_path)
 
-        # Determine content type based on extension
-        content_type = "video/mp2t"
-        if filename.endswith('.mp4'):
-            content_type = "video/mp4"
-        elif filename.endswith('.mkv'):
-            content_type = "video/x-matroska"
+        content_type = _content_type(filename)
 
         return web.FileResponse(
             file_path,
@@ -243,11 +283,6 @@ def setup_recording_routes(app, recording_manager):
         For active recordings: streams the growing file with chunked transfer,
         allowing users to watch while recording continues.
         """
-        import asyncio
-
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recording_id = request.match_info['id']
         recording = recording_manager.get_recording(recording_id)
 
@@ -261,19 +296,12 @@ def setup_recording_routes(app, recording_manager):
                                     status=404)
 
         # Security check
-        recordings_dir = os.path.abspath(recording_manager.recordings_dir)
-        file_abs = os.path.abspath(file_path)
-        if not file_abs.startswith(recordings_dir):
+        if not is_inside_recordings_dir(file_path):
             return web.json_response({"error": "Access denied"}, status=403)
 
-        # Determine content type based on extension
-        content_type = "video/mp2t"
-        if file_path.endswith('.mp4'):
-            content_type = "video/mp4"
-        elif file_path.endswith('.mkv'):
-            content_type = "video/x-matroska"
+        content_type = _content_type(file_path)
 
-        # For completed recordings: use efficient FileResponse
+        # For completed recordings: FileResponse (sendfile, zero-copy)
         if not recording.get('is_active'):
             return web.FileResponse(
                 file_path,
@@ -297,33 +325,42 @@ def setup_recording_routes(app, recording_manager):
 
         logger.debug(f"Starting live stream of active recording {recording_id}")
 
+        # Watch before opening so no write between the two is missed
+        recording_manager.watch_file(file_path)
         try:
-            with open(file_path, 'rb') as f:
+            # Raw fd: each read goes straight from the kernel into one bytes object
+            fd = _open_sequential(file_path)
+            try:
                 while True:
-                    chunk = f.read(65536)  # 64KB chunks
+                    chunk = os.read(fd, _LIVE_CHUNK_SIZE)
                     if chunk:
                         await response.write(chunk)
                     else:
                         # Check if recording is still active
                         rec = recording_manager.get_recording(recording_id)
                         if not rec or not rec.get('is_active'):
+                            # The file is final now: send whatever FFmpeg wrote
+                            # between our last read and its exit, then stop
+                            while chunk := os.read(fd, _LIVE_CHUNK_SIZE):
+                                await response.write(chunk)
                             logger.debug(f"Recording {recording_id} finished, ending stream")
                             break
                         # Wait for more data from recording process
-                        await asyncio.sleep(0.5)
+                        await recording_manager.wait_for_growth(file_path, timeout=2.0)
+            finally:
+                os.close(fd)
         except ConnectionResetError:
             logger.debug(f"Client disconnected from recording {recording_id} stream")
         except Exception as e:
             logger.warning(f"Error streaming recording {recording_id}: {e}")
+        finally:
+            recording_manager.unwatch_file(file_path)
 
         await response.write_eof()
         return response
 
     async def handle_active_recordings(request):
         """GET /api/recordings/active - Get only active recordings."""
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recordings = recording_manager.get_active_recordings()
         return web.json_response({"recordings": recordings})
 
@@ -342,9 +379,6 @@ def setup_recording_routes(app, recording_manager):
         Example:
             /record?url=https%3A%2F%2Fvavoo.to%2Fplay%2F...&name=Sky%20Sport&duration=3600
         """
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         url = request.query.get('url')
         if not url:
             return web.json_response({"error": "URL is required"}, status=400)
@@ -427,9 +461,6 @@ def setup_recording_routes(app, recording_manager):
         This endpoint is designed for Stremio integration: when clicked,
         it stops the recording and immediately redirects to play the recorded content.
         """
-        if not check_password(request):
-            return web.json_response({"error": "Unauthorized"}, status=401)
-
         recording_id = request.match_info['id']
         recording = recording_manager.get_recording(recording_id)
 
@@ -461,17 +492,17 @@ def setup_recording_routes(app, recording_manager):
 
     # Register routes
     app.router.add_get('/recordings', dvr_required(handle_recordings_page))
-    app.router.add_get('/record', dvr_required(handle_record_via_get))  # GET endpoint for StreamVix
-    app.router.add_get('/record/stop/{id}', dvr_required(handle_stop_and_stream))  # Stop recording and stream
-    app.router.add_get('/api/recordings', dvr_required(handle_list_recordings))
-    app.router.add_get('/api/recordings/active', dvr_required(handle_active_recordings))
-    app.router.add_post('/api/recordings/start', dvr_required(handle_start_recording))
-    app.router.add_delete('/api/recordings/all', dvr_required(handle_delete_all_recordings))
-    app.router.add_get('/api/recordings/{id}', dvr_required(handle_get_recording))
-    app.router.add_post('/api/recordings/{id}/stop', dvr_required(handle_stop_recording))
-    app.router.add_delete('/api/recordings/{id}', dvr_required(handle_delete_recording))
-    app.router.add_get('/api/recordings/{id}/delete', dvr_required(handle_delete_recording_get))
-    app.router.add_get('/api/recordings/{id}/download', dvr_required(handle_download_recording))
-    app.router.add_get('/api/recordings/{id}/stream', dvr_required(handle_stream_recording))
+    app.router.add_get('/record', dvr_required(auth_required(handle_record_via_get)))  # GET endpoint for StreamVix
+    app.router.add_get('/record/stop/{id}', dvr_required(auth_required(handle_stop_and_stream)))  # Stop recording and stream
+    app.router.add_get('/api/recordings', dvr_required(auth_required(handle_list_recordings)))
+    app.router.add_get('/api/recordings/active', dvr_required(auth_required(handle_active_recordings)))
+    app.router.add_post('/api/recordings/start', dvr_required(auth_required(handle_start_recording)))
+    app.router.add_delete('/api/recordings/all', dvr_required(auth_required(handle_delete_all_recordings)))
+    app.router.add_get('/api/recordings/{id}', dvr_required(auth_required(handle_get_recording)))
+    app.router.add_post('/api/recordings/{id}/stop', dvr_required(auth_required(handle_stop_recording)))
+    app.router.add_delete('/api/recordings/{id}', dvr_required(auth_required(handle_delete_recording)))
+    app.router.add_get('/api/recordings/{id}/delete', dvr_required(auth_required(handle_delete_recording_get)))
+    app.router.add_get('/api/recordings/{id}/download', dvr_required(auth_required(handle_download_recording)))
+    app.router.add_get('/api/recordings/{id}/stream', dvr_required(auth_required(handle_stream_recording)))
 
     logger.debug("Recording routes registered")
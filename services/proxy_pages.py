@@ -957,7 +957,7 @@ class HLSProxyPagesMixin:
 
         try:
             # Usa un proxy globale se configurato, altrimenti connessione diretta
-            proxy = random.choice(_shared.GLOBAL_PROXIES) if _shared.GLOBAL_PROXIES else None
+            proxy = _config.next_round_robin_proxy(_shared.GLOBAL_PROXIES)
 
             # Crea una sessione dedicata con il proxy configurato
             if proxy:
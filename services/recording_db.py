@@ -1,33 +1,157 @@
+import asyncio
 import sqlite3
 import os
 import threading
+import time
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Iterator, Iterable, Set
 
 logger = logging.getLogger(__name__)
 
+# Statements used on every request/poll. Kept as module constants so each one
+# is a single string object: sqlite3's per-connection statement cache then
+# hits on identity-equal text and never re-prepares it.
+# A URL already starting/recording (idx_recordings_active_url) is a no-op
+# insert (rowcount 0) rather than an IntegrityError
+_SQL_INSERT_STARTING = """
+    INSERT INTO recordings (id, name, url, status, started_at, started_at_ts)
+    VALUES (?, ?, ?, 'starting', ?, ?)
+    ON CONFLICT(url) WHERE status IN ('starting', 'recording') DO NOTHING
+"""
+_SQL_UPDATE_TO_RECORDING = """
+    UPDATE recordings
+    SET status = 'recording', file_path = ?, headers = ?, pid = ?
+    WHERE id = ? AND status = 'starting'
+"""
+# UPDATE ... RETURNING needs SQLite 3.35+
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_SQL_UPDATE_TO_RECORDING_RETURNING = _SQL_UPDATE_TO_RECORDING + "RETURNING *\n"
+_SQL_SELECT_BY_ID = "SELECT * FROM recordings WHERE id = ?"
+# Listings leave out the per-recording secrets (headers, clearkey): no
+# listing consumer reads them, and they are fetched with get_recording()
+_LIST_COLUMNS = (
+    "id, name, url, file_path, status, started_at, stopped_at,"
+    " duration_seconds, file_size_bytes, error_message, pid, started_at_ts"
+)
+_SQL_SELECT_BY_STATUS = f"""
+    SELECT {_LIST_COLUMNS} FROM recordings
+    WHERE status = ?
+    ORDER BY started_at DESC LIMIT ?
+"""
+_SQL_SELECT_ALL = f"""
+    SELECT {_LIST_COLUMNS} FROM recordings
+    ORDER BY started_at DESC LIMIT ?
+"""
+_SQL_UPDATE_STATUS_STOPPED = """
+    UPDATE recordings SET status = ?, stopped_at = ?, error_message = ?
+    WHERE id = ?
+"""
+_SQL_UPDATE_STATUS = """
+    UPDATE recordings SET status = ?, error_message = ?
+    WHERE id = ?
+"""
+_SQL_UPDATE_FILE_INFO = """
+    UPDATE recordings SET duration_seconds = ?, file_size_bytes = ?
+    WHERE id = ?
+"""
+_SQL_DELETE = "DELETE FROM recordings WHERE id = ?"
+
+
+def _utc_iso(ts: Optional[float] = None) -> str:
+    """Naive UTC ISO-8601 timestamp with microseconds, without a datetime object.
+
+    Same text datetime.utcnow().isoformat() produces, except that the
+    fraction is always present (fixed width keeps TEXT ordering exact).
+    """
+    if ts is None:
+        ts = time.time()
+    seconds = int(ts)
+    t = time.gmtime(seconds)
+    return (f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T"
+            f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}.{int((ts - seconds) * 1_000_000):06d}")
+
+
+def _fetch_dicts(cursor) -> List[Dict[str, Any]]:
+    """Plain tuple rows zipped with the column names (read once per query)."""
+    columns = tuple(d[0] for d in cursor.description)
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
 
 class RecordingDB:
     """SQLite database for managing recording metadata with persistent connection."""
 
+    # Read results are reused for this long (UI and live streams poll);
+    # any write from this process drops them immediately
+    _READ_CACHE_TTL = 0.25
+    _READ_CACHE_MAX = 256
+    _PID_CACHE_TTL = 1.0
+    # From this many PIDs on, one /proc listing beats a kill(0) per PID
+    _PROC_SCAN_MIN = 32
+
     def __init__(self, recordings_dir: str):
         self.db_path = os.path.join(recordings_dir, "recordings.db")
         self._local = threading.local()
+        # Every per-thread connection, so close() can release them all
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._read_cache: Dict[tuple, tuple] = {}  # key -> (expires_at, result)
+        self._pid_cache: Dict[int, tuple] = {}  # pid -> (expires_at, running)
+        # One thread owns all writes issued through run_write(): commits are
+        # serialized and never stall the event loop
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recording-db")
         self._init_db()
 
     def _get_connection(self):
         """Get a persistent connection per thread."""
-        if not hasattr(self._local, 'conn') or self._local.conn is None:
-            self._local.conn = sqlite3.connect(self.db_path)
-            self._local.conn.row_factory = sqlite3.Row
-            self._local.conn.execute("PRAGMA journal_mode=WAL")
-            self._local.conn.execute("PRAGMA busy_timeout=5000")
-        return self._local.conn
+        # Fast path (every query): a single thread-local lookup
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        # Each connection is only used by the thread that opened it;
+        # check_same_thread=False just lets close() run from another one
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Per-connection settings. WAL itself is persisted in the file
+        # (set once in _init_db); with WAL, NORMAL only fsyncs at
+        # checkpoints and is still safe against corruption
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # ~64 MiB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB: pages read in place
+        conn.execute("PRAGMA busy_timeout=5000")
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def maintenance(self):
+        """Fold the WAL back into the main file (truncating it) and refresh planner stats."""
+        conn = self._get_connection()
+        busy, wal_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        conn.execute("PRAGMA optimize")
+        logger.debug(f"Recording database checkpoint: busy={busy} wal_pages={wal_pages} checkpointed={checkpointed}")
+
+    async def run_write(self, method, *args):
+        """Run a write method (e.g. self.update_recording_status) on the writer thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._writer, method, *args)
+
+    def close(self):
+        """Close all connections (the last one to close checkpoints the WAL)."""
+        self._writer.shutdown(wait=True)
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error as e:
+                logger.debug(f"Error closing recording database connection: {e}")
+        self._local = threading.local()
 
     def _init_db(self):
         """Initialize the database schema."""
         conn = self._get_connection()
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS recordings (
@@ -43,10 +167,26 @@ class RecordingDB:
                 error_message TEXT,
                 headers TEXT,
                 clearkey TEXT,
-                pid INTEGER
+                pid INTEGER,
+                started_at_ts INTEGER
             )
         """)
 
+        # Databases created before started_at_ts: add it and fill it from
+        # started_at (naive UTC, which strftime('%s') reads as UTC)
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(recordings)")}
+        if 'started_at_ts' not in columns:
+            try:
+                cursor.execute("ALTER TABLE recordings ADD COLUMN started_at_ts INTEGER")
+            except sqlite3.OperationalError as e:
+                # Another worker migrated first
+                if 'duplicate column' not in str(e):
+                    raise
+            cursor.execute("""
+                UPDATE recordings SET started_at_ts = CAST(strftime('%s', started_at) AS INTEGER)
+                WHERE started_at_ts IS NULL
+            """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_recordings_status
             ON recordings(status)
@@ -57,65 +197,93 @@ class RecordingDB:
             ON recordings(started_at)
         """)
 
+        # Retention scan: status is filtered inside the index walk
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_recordings_old
+            ON recordings(started_at, status)
+        """)
+
         cursor.execute("""
             CREATE UNIQUE INDEX IF NOT EXISTS idx_recordings_active_url
             ON recordings(url) WHERE status IN ('starting', 'recording')
         """)
         conn.commit()
-        logger.debug(f"Recording database initialized at {self.db_path}")
+        mmap_size = conn.execute("PRAGMA mmap_size").fetchone()[0]
+        logger.debug(f"Recording database initialized at {self.db_path} (mmap_size={mmap_size})")
+
+    def _cached_read(self, key: tuple):
+        entry = self._read_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _store_read(self, key: tuple, result):
+        if len(self._read_cache) >= self._READ_CACHE_MAX:
+            self._read_cache.clear()
+        self._read_cache[key] = (time.monotonic() + self._READ_CACHE_TTL, result)
 
     def _execute(self, sql: str, params=()):
+        self._read_cache.clear()
         conn = self._get_connection()
-        cur = conn.cursor()
-        cur.execute(sql, params)
+        cur = conn.execute(sql, params)
         conn.commit()
+        # Again after the commit: a read racing the write may have re-cached old rows
+        self._read_cache.clear()
         return cur
 
     def create_starting_entry(self, recording_id: str, name: str, url: str) -> bool:
-        started_at = datetime.utcnow().isoformat()
+        now = time.time()
         try:
-            self._execute("""
-                INSERT INTO recordings (id, name, url, status, started_at)
-                VALUES (?, ?, ?, 'starting', ?)
-            """, (recording_id, name, url, started_at))
-            logger.debug(f"Created starting entry: {recording_id} for URL: {url[:80]}...")
-            return True
-        except sqlite3.IntegrityError:
+            cur = self._execute(_SQL_INSERT_STARTING, (recording_id, name, url, _utc_iso(now), int(now)))
+        except sqlite3.IntegrityError:  # Recording id collision
+            cur = None
+        if cur is None or cur.rowcount == 0:
             logger.debug(f"Duplicate recording attempt for URL: {url[:80]}...")
             return False
+        logger.debug(f"Created starting entry: {recording_id} for URL: {url[:80]}...")
+        return True
 
     def update_to_recording(self, recording_id: str, file_path: str,
-                            headers: str = None, pid: int = None) -> bool:
-        cur = self._execute("""
-            UPDATE recordings
-            SET status = 'recording', file_path = ?, headers = ?, pid = ?
-            WHERE id = ? AND status = 'starting'
-        """, (file_path, headers, pid, recording_id))
-        return cur.rowcount > 0
+                            headers: str = None, pid: int = None) -> Optional[Dict[str, Any]]:
+        """Promote a 'starting' entry; returns the updated row (None if it was not 'starting')."""
+        params = (file_path, headers, pid, recording_id)
+        if not _HAS_RETURNING:
+            cur = self._execute(_SQL_UPDATE_TO_RECORDING, params)
+            return self.get_recording(recording_id) if cur.rowcount > 0 else None
+        self._read_cache.clear()
+        conn = self._get_connection()
+        # The row comes back from the UPDATE itself (read before committing)
+        rows = _fetch_dicts(conn.execute(_SQL_UPDATE_TO_RECORDING_RETURNING, params))
+        conn.commit()
+        self._read_cache.clear()
+        return rows[0] if rows else None
 
     def get_recording(self, recording_id: str) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM recordings WHERE id = ?", (recording_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        key = ('id', recording_id)
+        cached = self._cached_read(key)
+        if cached is None:
+            rows = _fetch_dicts(self._get_connection().execute(_SQL_SELECT_BY_ID, (recording_id,)))
+            if not rows:
+                return None
+            cached = rows[0]
+            self._store_read(key, cached)
+        # Copies: callers enrich the dicts in place
+        return dict(cached)
 
     def get_all_recordings(self, status: str = None,
                            limit: int = 100) -> List[Dict[str, Any]]:
+        key = ('all', status, limit)
+        cached = self._cached_read(key)
+        if cached is not None:
+            return [dict(row) for row in cached]
         conn = self._get_connection()
-        cursor = conn.cursor()
         if status:
-            cursor.execute("""
-                SELECT * FROM recordings
-                WHERE status = ?
-                ORDER BY started_at DESC LIMIT ?
-            """, (status, limit))
+            cursor = conn.execute(_SQL_SELECT_BY_STATUS, (status, limit))
         else:
-            cursor.execute("""
-                SELECT * FROM recordings
-                ORDER BY started_at DESC LIMIT ?
-            """, (limit,))
-        return [dict(row) for row in cursor.fetchall()]
+            cursor = conn.execute(_SQL_SELECT_ALL, (limit,))
+        rows = _fetch_dicts(cursor)
+        self._store_read(key, rows)
+        return [dict(row) for row in rows]
 
     def get_active_recordings(self) -> List[Dict[str, Any]]:
         return self.get_all_recordings(status='recording')
@@ -123,50 +291,118 @@ class RecordingDB:
     def update_recording_status(self, recording_id: str, status: str,
                                  error_message: str = None) -> bool:
         if status in ('completed', 'failed', 'stopped'):
-            stopped_at = datetime.utcnow().isoformat()
-            cur = self._execute("""
-                UPDATE recordings SET status = ?, stopped_at = ?, error_message = ?
-                WHERE id = ?
-            """, (status, stopped_at, error_message, recording_id))
+            stopped_at = _utc_iso()
+            cur = self._execute(_SQL_UPDATE_STATUS_STOPPED, (status, stopped_at, error_message, recording_id))
         else:
-            cur = self._execute("""
-                UPDATE recordings SET status = ?, error_message = ?
-                WHERE id = ?
-            """, (status, error_message, recording_id))
+            cur = self._execute(_SQL_UPDATE_STATUS, (status, error_message, recording_id))
         return cur.rowcount > 0
 
     def update_recording_file_info(self, recording_id: str,
                                     duration_seconds: int = None,
                                     file_size_bytes: int = None) -> bool:
-        cur = self._execute("""
-            UPDATE recordings SET duration_seconds = ?, file_size_bytes = ?
-            WHERE id = ?
-        """, (duration_seconds, file_size_bytes, recording_id))
+        cur = self._execute(_SQL_UPDATE_FILE_INFO, (duration_seconds, file_size_bytes, recording_id))
         return cur.rowcount > 0
 
+    def update_many_recording_status(self, updates: List[tuple]) -> int:
+        """Apply several (recording_id, status, error_message) updates in one transaction."""
+        if not updates:
+            return 0
+        now = _utc_iso()
+        rows = [
+            (status, now if status in ('completed', 'failed', 'stopped') else None,
+             error_message, recording_id)
+            for recording_id, status, error_message in updates
+        ]
+        self._read_cache.clear()
+        conn = self._get_connection()
+        with conn:
+            cur = conn.executemany("""
+                UPDATE recordings
+                SET status = ?, stopped_at = COALESCE(?, stopped_at), error_message = ?
+                WHERE id = ?
+            """, rows)
+        self._read_cache.clear()
+        return cur.rowcount
+
+    def update_many_file_info(self, updates: List[tuple]) -> int:
+        """Apply several (recording_id, duration_seconds, file_size_bytes) updates in one transaction."""
+        if not updates:
+            return 0
+        self._read_cache.clear()
+        conn = self._get_connection()
+        with conn:
+            cur = conn.executemany(_SQL_UPDATE_FILE_INFO, [(duration, size, recording_id) for recording_id, duration, size in updates])
+        self._read_cache.clear()
+        return cur.rowcount
+
     def delete_recording(self, recording_id: str) -> bool:
-        cur = self._execute("DELETE FROM recordings WHERE id = ?", (recording_id,))
+        cur = self._execute(_SQL_DELETE, (recording_id,))
         deleted = cur.rowcount > 0
         if deleted:
             logger.debug(f"Deleted recording entry: {recording_id}")
         return deleted
 
+    def delete_many_recordings(self, recording_ids: List[str]) -> int:
+        """Delete several recording entries in one transaction."""
+        if not recording_ids:
+            return 0
+        self._read_cache.clear()
+        conn = self._get_connection()
+        with conn:
+            cur = conn.executemany(_SQL_DELETE, [(recording_id,) for recording_id in recording_ids])
+        self._read_cache.clear()
+        logger.debug(f"Deleted {cur.rowcount} recording entries")
+        return cur.rowcount
+
     def is_pid_running(self, pid: int) -> bool:
+        # Every listing/stream poll asks this for each recording: memoize briefly
+        now = time.monotonic()
+        cached = self._pid_cache.get(pid)
+        if cached and cached[0] > now:
+            return cached[1]
         try:
             os.kill(pid, 0)
+            running = True
         except ProcessLookupError:
-            return False
+            running = False
         except OSError:
-            return True
-        return True
+            running = True
+        if len(self._pid_cache) >= self._READ_CACHE_MAX:
+            self._pid_cache.clear()
+        self._pid_cache[pid] = (now + self._PID_CACHE_TTL, running)
+        return running
+
+    def running_pids(self, pids: Iterable[int]) -> Set[int]:
+        """The subset of `pids` that is still running, checked in one batch."""
+        pids = {pid for pid in pids if pid}
+        if len(pids) >= self._PROC_SCAN_MIN:
+            try:
+                live = {int(d) for d in os.listdir('/proc') if d.isdigit()}
+            except OSError:
+                pass  # No procfs: fall back to one probe per PID
+            else:
+                expires_at = time.monotonic() + self._PID_CACHE_TTL
+                if len(self._pid_cache) + len(pids) > self._READ_CACHE_MAX:
+                    self._pid_cache.clear()
+                for pid in pids:
+                    self._pid_cache[pid] = (expires_at, pid in live)
+                return pids & live
+        return {pid for pid in pids if self.is_pid_running(pid)}
 
     def get_old_recordings(self, days: int) -> List[Dict[str, Any]]:
-        from datetime import timedelta
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM recordings
-            WHERE started_at < ? AND status != 'recording'
+        """Recordings past retention (id and file_path only: enough for cleanup)."""
+        return list(self.iter_old_recordings(days))
+
+    def iter_old_recordings(self, days: int, batch: int = 256) -> Iterator[Dict[str, Any]]:
+        """Like get_old_recordings(), but fetched `batch` rows at a time."""
+        # ISO-8601 UTC strings sort chronologically: a plain TEXT range scan
+        # on idx_recordings_old, with the status test answered by the index
+        cutoff = _utc_iso(time.time() - days * 86400)
+        cursor = self._get_connection().execute("""
+            SELECT id, file_path FROM recordings
+            WHERE started_at < ? AND status IN ('starting', 'completed', 'failed', 'stopped')
         """, (cutoff,))
-        return [dict(row) for row in cursor.fetchall()]
+        columns = tuple(d[0] for d in cursor.description)
+        while rows := cursor.fetchmany(batch):
+            for row in rows:
+                yield dict(zip(columns, row))
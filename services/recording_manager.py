@@ -1,22 +1,45 @@
 import asyncio
-import uuid
+import collections
+import functools
 import logging
 import os
 import re
+import secrets
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Dict, List, Optional, Any, Tuple
-from urllib.parse import urlencode
+from urllib.parse import urlencode, quote_plus
 
 import aiohttp
 import config_store
 from services.recording_db import RecordingDB
 from config import PORT, API_PASSWORD
 
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
 logger = logging.getLogger(__name__)
 
+_URI_RE = re.compile(r'URI="([^"]+)"')
+
+# Everything but str.isalnum() characters, space, '-' and '_' (\w is
+# exactly isalnum() plus '_' for str patterns)
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w \-]+')
+
+# Group names are StreamType values, listed in detection priority order
+_STREAM_TYPE_RE = re.compile(
+    r'(?P<mpd>\.mpd)'
+    r'|(?P<vavoo>vavoo\.to)'
+    r'|(?P<freeshot>popcdn\.day|freeshot)'
+    r'|(?P<sportsonline>sportsonline|sportzonline|sportsonlline|sportsonlinne)',
+    re.IGNORECASE,
+)
+_STREAM_TYPE_PRIORITY = tuple(_STREAM_TYPE_RE.groupindex)
+
 
 class StreamType(Enum):
     """Stream type classification for recording."""
@@ -27,6 +50,40 @@ class StreamType(Enum):
     GENERIC = "generic"   # Unknown/generic HLS streams
 
 
+@functools.lru_cache(maxsize=512)
+def _detect_stream_type(url: str) -> StreamType:
+    """Detect the stream type based on URL patterns (memoized: channels get re-recorded)."""
+    # One scan for every marker; the priority order breaks ties
+    found = {m.lastgroup for m in _STREAM_TYPE_RE.finditer(url)}
+    for name in _STREAM_TYPE_PRIORITY:
+        if name in found:
+            return StreamType(name)
+
+    return StreamType.GENERIC
+
+
+def _safe_stat(path: str) -> Optional[os.stat_result]:
+    """os.stat() that returns None for a missing file (one syscall, no exists() race)."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+async def _stat_async(path: str) -> Optional[os.stat_result]:
+    """_safe_stat() in the default executor: a slow disk never stalls the loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, _safe_stat, path)
+
+
+async def _remove_async(path: str) -> bool:
+    """os.remove() in the default executor; False if the file was already gone."""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, os.remove, path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
 @dataclass
 class StreamConfig:
     """Configuration for recording a stream."""
@@ -44,22 +101,42 @@ class RecordingManager:
     RECONNECT_TYPES = {StreamType.VAVOO, StreamType.FREESHOT,
                        StreamType.SPORTSONLINE, StreamType.MPD}
 
+    # Retention cleanup: recordings deleted per DB transaction, concurrent
+    # unlinks, and the pause between batches (keeps the disk usable by
+    # live recordings during a large purge)
+    CLEANUP_BATCH_SIZE = 256
+    CLEANUP_UNLINK_CONCURRENCY = 8
+    CLEANUP_BATCH_PAUSE = 0.1
+
+    # Recorder stderr kept for diagnostics: the last N 4 KiB reads
+    STDERR_TAIL_CHUNKS = 16
+
     def __init__(self, recordings_dir: str):
         self.recordings_dir = recordings_dir
-        if not os.path.exists(self.recordings_dir):
-            os.makedirs(self.recordings_dir)
+        # Startup only: the database below is opened in this directory
+        os.makedirs(self.recordings_dir, exist_ok=True)
         self.db = RecordingDB(recordings_dir)
+        # Constant part of every local proxy URL, encoded once
+        self._proxy_query_suffix = '&no_bypass=1' + (
+            f'&api_password={quote_plus(API_PASSWORD)}' if API_PASSWORD else ''
+        )
         self.processes: Dict[str, asyncio.subprocess.Process] = {}
         self.start_times: Dict[str, float] = {}
         self._session: Optional[aiohttp.ClientSession] = None
         self._monitor_tasks: Dict[str, asyncio.Task] = {}
+        # Growth notifications for live viewers (Linux inotify, optional)
+        self._inotify = None
+        self._watches: Dict[str, List[Any]] = {}  # file_path -> [wd, event, refs]
+        self._watch_paths: Dict[int, str] = {}
 
     @property
     def session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
             self._session = aiohttp.ClientSession(
                 timeout=aiohttp.ClientTimeout(total=30, connect=10),
-                connector=aiohttp.TCPConnector(limit=10),
+                # Master playlists all come from the local proxy: keep the
+                # connection around between recording starts
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60),
             )
         return self._session
 
@@ -72,21 +149,7 @@ class RecordingManager:
     # Stream Type Detection
     # =========================================================================
 
-    @staticmethod
-    def _detect_stream_type(url: str) -> StreamType:
-        """Detect the stream type based on URL patterns."""
-        url_lower = url.lower()
-
-        if '.mpd' in url_lower:
-            return StreamType.MPD
-        elif 'vavoo.to' in url_lower:
-            return StreamType.VAVOO
-        elif 'popcdn.day' in url_lower or 'freeshot' in url_lower:
-            return StreamType.FREESHOT
-        elif any(d in url_lower for d in ['sportsonline', 'sportzonline', 'sportsonlline', 'sportsonlinne']):
-            return StreamType.SPORTSONLINE
-
-        return StreamType.GENERIC
+    _detect_stream_type = staticmethod(_detect_stream_type)
 
     # =========================================================================
     # Stream Configuration Preparation
@@ -122,18 +185,17 @@ class RecordingManager:
         - ClearKey DRM requiring decryption parameters
         - Separate audio tracks requiring dual-input recorder
         """
-        proxy_params = self._build_proxy_params(url)
+        query = self._build_proxy_query(url)
 
         # Add ClearKey parameters for DRM-protected streams
         if clearkey and ':' in clearkey:
             key_id, key = clearkey.split(':', 1)
-            proxy_params['key_id'] = key_id
-            proxy_params['key'] = key
+            query += '&' + urlencode({'key_id': key_id, 'key': key})
             logger.debug("🔐 MPD Recording with ClearKey decryption enabled")
         else:
             logger.warning("⚠️ MPD Recording without ClearKey - content may be encrypted")
 
-        master_url = f"http://127.0.0.1:{PORT}/proxy/mpd/manifest.m3u8?{urlencode(proxy_params)}"
+        master_url = f"http://127.0.0.1:{PORT}/proxy/mpd/manifest.m3u8?{query}"
         logger.info(f"Recording MPD stream: {url[:80]}...")
 
         # Parse master playlist to extract separate audio track
@@ -161,8 +223,7 @@ class RecordingManager:
         HLS streams typically have audio muxed with video, so no separate
         audio URL is needed.
         """
-        proxy_params = self._build_proxy_params(url)
-        video_url = f"http://127.0.0.1:{PORT}/proxy/hls/manifest.m3u8?{urlencode(proxy_params)}"
+        video_url = f"http://127.0.0.1:{PORT}/proxy/hls/manifest.m3u8?{self._build_proxy_query(url)}"
 
         logger.info(f"Recording HLS stream ({stream_type.value}): {url[:80]}...")
 
@@ -174,12 +235,9 @@ class RecordingManager:
             needs_extended_probe=False
         )
 
-    def _build_proxy_params(self, url: str) -> Dict[str, str]:
-        """Build common proxy parameters."""
-        params = {'d': url, 'no_bypass': '1'}
-        if API_PASSWORD:
-            params['api_password'] = API_PASSWORD
-        return params
+    def _build_proxy_query(self, url: str) -> str:
+        """Build the common proxy query string (same text urlencode() gives)."""
+        return f"d={quote_plus(url)}{self._proxy_query_suffix}"
 
     # =========================================================================
     # Master Playlist Parsing
@@ -197,40 +255,48 @@ class RecordingManager:
             audio_playlist_url may be None if audio is embedded in video
         """
         try:
-            async with self.session.get(
-                master_url,
-                timeout=aiohttp.ClientTimeout(total=30)
-            ) as resp:
-                    if resp.status != 200:
-                        logger.error(f"Failed to fetch master playlist: {resp.status}")
-                        return None, None
-                    content = await resp.text()
-
-            video_url = None
-            audio_url = None
-
-            lines = content.strip().split('\n')
-            for i, line in enumerate(lines):
-                # Parse EXT-X-MEDIA for separate audio track
-                if line.startswith('#EXT-X-MEDIA:') and 'TYPE=AUDIO' in line:
-                    uri_match = re.search(r'URI="([^"]+)"', line)
-                    if uri_match and audio_url is None:
-                        if 'DEFAULT=YES' in line or audio_url is None:
-                            audio_url = uri_match.group(1)
+            # Pooled session (timeouts set on the session itself)
+            async with self.session.get(master_url) as resp:
+                if resp.status != 200:
+                    logger.error(f"Failed to fetch master playlist: {resp.status}")
+                    return None, None
+                content = await resp.text()
 
-                # Parse EXT-X-STREAM-INF for video variant
-                elif line.startswith('#EXT-X-STREAM-INF:'):
-                    if i + 1 < len(lines):
-                        next_line = lines[i + 1].strip()
-                        if next_line and not next_line.startswith('#'):
-                            video_url = next_line
-
-            return video_url, audio_url
+            return self._parse_master_content(content)
 
         except Exception as e:
             logger.error(f"Error parsing master playlist: {e}")
             return None, None
 
+    @staticmethod
+    def _parse_master_content(content: str) -> Tuple[Optional[str], Optional[str]]:
+        """Extract (video_playlist_url, audio_playlist_url) from master playlist text."""
+        video_url = None
+        audio_url = None
+
+        # One-line lookahead state instead of indexing into a list of lines
+        expect_uri = False
+        for line in content.splitlines():
+            if expect_uri:
+                expect_uri = False
+                uri = line.strip()
+                if uri and not uri.startswith('#'):
+                    video_url = uri  # The last variant wins
+                    continue
+
+            # Parse EXT-X-MEDIA for separate audio track (the first one wins)
+            if line.startswith('#EXT-X-MEDIA:') and 'TYPE=AUDIO' in line:
+                if audio_url is None:
+                    uri_match = _URI_RE.search(line)
+                    if uri_match:
+                        audio_url = uri_match.group(1)
+
+            # Parse EXT-X-STREAM-INF for video variant
+            elif line.startswith('#EXT-X-STREAM-INF:'):
+                expect_uri = True
+
+        return video_url, audio_url
+
     # =========================================================================
     # FFmpeg Command Building
     # =========================================================================
@@ -250,7 +316,10 @@ class RecordingManager:
         cmd = [
             "ffmpeg",
             "-hide_banner",
-            "-loglevel", "info",
+            # Only problems reach stderr (kept as the failure reason); the
+            # progress line would otherwise be rewritten several times a second
+            "-loglevel", "warning",
+            "-nostats",
             "-y",
         ]
 
@@ -344,15 +413,16 @@ class RecordingManager:
         recording_id = self._generate_recording_id()
 
         # Claim the recording (prevents duplicates)
-        if not self.db.create_starting_entry(recording_id, name, url):
+        if not await self.db.run_write(self.db.create_starting_entry, recording_id, name, url):
             logger.info(f"Recording already exists for URL: {url[:80]}...")
             return None
 
         filename = self._generate_filename(recording_id, name)
         recordings_dir = config_store.get("recordings_dir", self.recordings_dir)
         file_path = os.path.join(recordings_dir, filename)
-        if not os.path.exists(recordings_dir):
-            os.makedirs(recordings_dir)
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(os.makedirs, recordings_dir, exist_ok=True)
+        )
 
         # Apply duration limits
         max_duration = config_store.get("max_recording_duration", 28800)
@@ -374,28 +444,26 @@ class RecordingManager:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
+                # Output goes to file_path; nothing reads stdout
+                stdout=asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.PIPE
             )
 
             self.processes[recording_id] = process
             self.start_times[recording_id] = time.time()
 
-            self.db.update_to_recording(
-                recording_id=recording_id,
-                file_path=file_path,
-                headers=None,
-                pid=process.pid
+            recording = await self.db.run_write(
+                self.db.update_to_recording, recording_id, file_path, None, process.pid
             )
 
             task = asyncio.create_task(self._monitor_recording(recording_id, process))
             self._monitor_tasks[recording_id] = task
 
-            return self.db.get_recording(recording_id)
+            return recording or self.db.get_recording(recording_id)
 
         except Exception as e:
             logger.error(f"Failed to start recording {recording_id}: {e}")
-            self.db.update_recording_status(recording_id, 'failed', str(e))
+            await self.db.run_write(self.db.update_recording_status, recording_id, 'failed', str(e))
             return None
 
     async def stop_recording(self, recording_id: str) -> bool:
@@ -409,6 +477,19 @@ class RecordingManager:
             logger.warning(f"Recording {recording_id} not found in database")
             return False
 
+        await self._stop_process(recording_id, recording)
+
+        await self.db.run_write(self.db.update_recording_status, recording_id, 'stopped')
+
+        file_info = await self._stopped_file_info(recording)
+        if file_info:
+            await self.db.run_write(self.db.update_recording_file_info, *file_info)
+
+        logger.info(f"Recording {recording_id} stopped")
+        return True
+
+    async def _stop_process(self, recording_id: str, recording: Dict[str, Any]):
+        """Stop the recorder of `recording` (local process, or PID from DB)."""
         if recording_id in self.processes:
             process = self.processes[recording_id]
             try:
@@ -455,18 +536,14 @@ class RecordingManager:
                 except Exception as e:
                     logger.error(f"Error killing process {pid}: {e}")
 
-        self.db.update_recording_status(recording_id, 'stopped')
-
-        if recording.get('file_path'):
-            file_path = recording['file_path']
-            if os.path.exists(file_path):
-                started_at = recording.get('started_at')
-                rec_duration = self._calculate_elapsed(started_at) if started_at else 0
-                file_size = os.path.getsize(file_path)
-                self.db.update_recording_file_info(recording_id, rec_duration, file_size)
-
-        logger.info(f"Recording {recording_id} stopped")
-        return True
+    async def _stopped_file_info(self, recording: Dict[str, Any]) -> Optional[tuple]:
+        """(recording_id, duration, size) of a stopped recording's file, if it exists."""
+        if not recording.get('file_path'):
+            return None
+        st = await _stat_async(recording['file_path'])
+        if st is None:
+            return None
+        return recording['id'], self._calculate_elapsed(recording), st.st_size
 
     async def _monitor_recording(
         self,
@@ -475,31 +552,36 @@ class RecordingManager:
     ):
         """Monitor a recording process and update status when complete."""
         try:
-            _, stderr = await process.communicate()
+            # Drain stderr as it comes, keeping only the tail: hours of
+            # recorder output are never buffered and the pipe never fills.
+            # Read in chunks, not lines: a line can end in \r only
+            tail = collections.deque(maxlen=self.STDERR_TAIL_CHUNKS)
+            while chunk := await process.stderr.read(4096):
+                tail.append(chunk)
+            await process.wait()
 
             if recording_id not in self.processes:
                 return
 
-            stderr_text = stderr.decode() if stderr else ""
+            stderr_text = b''.join(tail).decode(errors='replace')
 
             if stderr_text:
-                logger.debug(f"Recording {recording_id} recorder output: {stderr_text[:1000]}")
+                logger.debug(f"Recording {recording_id} recorder output: {stderr_text[-1000:]}")
 
             if process.returncode == 0:
                 logger.info(f"Recording {recording_id} completed successfully")
-                self.db.update_recording_status(recording_id, 'completed')
+                await self.db.run_write(self.db.update_recording_status, recording_id, 'completed')
             else:
-                error_msg = stderr_text[:500] if stderr_text else "Unknown error"
+                error_msg = stderr_text[-500:] if stderr_text else "Unknown error"
                 logger.error(f"Recording {recording_id} failed with code {process.returncode}: {error_msg}")
-                self.db.update_recording_status(recording_id, 'failed', error_msg)
+                await self.db.run_write(self.db.update_recording_status, recording_id, 'failed', error_msg)
 
             recording = self.db.get_recording(recording_id)
             if recording and recording.get('file_path'):
-                file_path = recording['file_path']
-                if os.path.exists(file_path):
+                st = await _stat_async(recording['file_path'])
+                if st is not None:
                     rec_duration = int(time.time() - self.start_times.get(recording_id, time.time()))
-                    file_size = os.path.getsize(file_path)
-                    self.db.update_recording_file_info(recording_id, rec_duration, file_size)
+                    await self.db.run_write(self.db.update_recording_file_info, recording_id, rec_duration, st.st_size)
 
         except asyncio.CancelledError:
             pass
@@ -519,14 +601,14 @@ class RecordingManager:
         if not recording:
             return False
 
-        if recording.get('file_path') and os.path.exists(recording['file_path']):
+        if recording.get('file_path'):
             try:
-                os.remove(recording['file_path'])
-                logger.debug(f"Deleted recording file: {recording['file_path']}")
+                if await _remove_async(recording['file_path']):
+                    logger.debug(f"Deleted recording file: {recording['file_path']}")
             except Exception as e:
                 logger.error(f"Error deleting file: {e}")
 
-        return self.db.delete_recording(recording_id)
+        return await self.db.run_write(self.db.delete_recording, recording_id)
 
     # =========================================================================
     # Recording Queries
@@ -540,13 +622,15 @@ class RecordingManager:
     def get_all_recordings(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all recordings, optionally filtered by status."""
         recordings = self.db.get_all_recordings(status=status)
-        return [self._enrich_recording(rec) for rec in recordings]
+        live_pids = self._live_pids(recordings)
+        return [self._enrich_recording(rec, live_pids) for rec in recordings]
 
     def get_active_recordings(self) -> List[Dict[str, Any]]:
         """Get currently active recordings."""
         recordings = self.db.get_all_recordings(status='recording')
-        return [self._enrich_recording(rec) for rec in recordings
-                if self._is_recording_active(rec)]
+        live_pids = self._live_pids(recordings)
+        return [self._enrich_recording(rec, live_pids) for rec in recordings
+                if self._is_recording_active(rec, live_pids)]
 
     def get_active_recording_by_url(self, url: str) -> Optional[Dict[str, Any]]:
         """Check if there's an active recording for the given URL."""
@@ -573,10 +657,37 @@ class RecordingManager:
     async def cleanup_old_recordings(self):
         """Delete recordings older than retention period."""
         retention = config_store.get("recordings_retention_days", 7)
-        old_recordings = self.db.get_old_recordings(retention)
-        for recording in old_recordings:
+        batch = []
+        for recording in self.db.iter_old_recordings(retention, self.CLEANUP_BATCH_SIZE):
             logger.info(f"Auto-deleting old recording: {recording['id']}")
-            await self.delete_recording(recording['id'])
+            if recording['id'] in self.processes:
+                # Still owned by this worker: stop it properly first
+                await self.delete_recording(recording['id'])
+                continue
+            batch.append(recording)
+            if len(batch) >= self.CLEANUP_BATCH_SIZE:
+                await self._delete_recordings_batch(batch)
+                batch = []
+                await asyncio.sleep(self.CLEANUP_BATCH_PAUSE)
+        if batch:
+            await self._delete_recordings_batch(batch)
+        # After this pass's writes: keeps the -wal file from growing unbounded
+        await self.db.run_write(self.db.maintenance)
+
+    async def _delete_recordings_batch(self, recordings: List[Dict[str, Any]]):
+        """Unlink the files of `recordings` concurrently, then drop their rows at once."""
+        sem = asyncio.Semaphore(self.CLEANUP_UNLINK_CONCURRENCY)
+
+        async def unlink(file_path):
+            async with sem:
+                try:
+                    if await _remove_async(file_path):
+                        logger.debug(f"Deleted recording file: {file_path}")
+                except Exception as e:
+                    logger.error(f"Error deleting file: {e}")
+
+        await asyncio.gather(*(unlink(rec['file_path']) for rec in recordings if rec.get('file_path')))
+        await self.db.run_write(self.db.delete_many_recordings, [rec['id'] for rec in recordings])
 
     async def cleanup_loop(self):
         """Periodically clean up old recordings."""
@@ -587,16 +698,116 @@ class RecordingManager:
                 logger.error(f"Error in cleanup loop: {e}")
             await asyncio.sleep(3600)
 
+    # =========================================================================
+    # Live Growth Notifications
+    # =========================================================================
+
+    def _get_inotify(self):
+        """Lazily create the inotify instance and hook it into the event loop."""
+        if self._inotify is None and INotify is not None:
+            try:
+                inotify = INotify()
+                asyncio.get_running_loop().add_reader(inotify.fileno(), self._drain_inotify)
+                self._inotify = inotify
+            except Exception as e:
+                logger.debug(f"inotify unavailable, falling back to polling: {e}")
+        return self._inotify
+
+    def _drain_inotify(self):
+        """Wake the viewers of every file that was written or closed."""
+        for event in self._inotify.read(timeout=0):
+            path = self._watch_paths.get(event.wd)
+            watch = self._watches.get(path) if path else None
+            if watch:
+                watch[1].set()
+
+    def watch_file(self, file_path: str):
+        """Start receiving growth notifications for a recording file."""
+        watch = self._watches.get(file_path)
+        if watch:
+            watch[2] += 1
+            return
+        inotify = self._get_inotify()
+        if inotify is None:
+            return
+        try:
+            wd = inotify.add_watch(file_path, inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE)
+        except OSError as e:
+            logger.debug(f"Cannot watch {file_path}: {e}")
+            return
+        self._watches[file_path] = [wd, asyncio.Event(), 1]
+        self._watch_paths[wd] = file_path
+
+    def unwatch_file(self, file_path: str):
+        """Release a watch taken with watch_file()."""
+        watch = self._watches.get(file_path)
+        if not watch:
+            return
+        watch[2] -= 1
+        if watch[2] > 0:
+            return
+        del self._watches[file_path]
+        self._watch_paths.pop(watch[0], None)
+        try:
+            self._inotify.rm_watch(watch[0])
+        except OSError:
+            pass  # File already deleted: the kernel dropped the watch
+
+    async def wait_for_growth(self, file_path: str, timeout: float = 2.0):
+        """Wait until the recording file is written to (or timeout expires).
+
+        Without an inotify watch this degrades to the old fixed 0.5s poll.
+        """
+        watch = self._watches.get(file_path)
+        if not watch:
+            await asyncio.sleep(0.5)
+            return
+        event = watch[1]
+        # Safe: _drain_inotify only runs while we are suspended below, so
+        # any write after the caller's last read is still queued on the fd
+        event.clear()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
     async def shutdown(self):
         """Gracefully stop all recordings on shutdown."""
         logger.info("Shutting down RecordingManager...")
+        # Same as stop_recording() for each one, but the DB rows are
+        # written in one transaction per kind instead of two per recording
+        stopped = []
         for recording_id in list(self.processes.keys()):
-            await self.stop_recording(recording_id)
+            recording = self.db.get_recording(recording_id)
+            if not recording:
+                logger.warning(f"Recording {recording_id} not found in database")
+                continue
+            await self._stop_process(recording_id, recording)
+            stopped.append(recording)
+        if stopped:
+            file_infos = []
+            for recording in stopped:
+                file_info = await self._stopped_file_info(recording)
+                if file_info:
+                    file_infos.append(file_info)
+            await self.db.run_write(
+                self.db.update_many_recording_status,
+                [(recording['id'], 'stopped', None) for recording in stopped],
+            )
+            await self.db.run_write(self.db.update_many_file_info, file_infos)
+            logger.info(f"Stopped {len(stopped)} recording(s)")
         for task in list(self._monitor_tasks.values()):
             if not task.done():
                 task.cancel()
         if self._monitor_tasks:
             await asyncio.wait(list(self._monitor_tasks.values()), timeout=5)
+        if self._inotify is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify.fileno())
+            self._inotify.close()
+            self._inotify = None
+            self._watches.clear()
+            self._watch_paths.clear()
+        self.db.close()
         await self.close()
 
     # =========================================================================
@@ -604,27 +815,40 @@ class RecordingManager:
     # =========================================================================
 
     def _generate_recording_id(self) -> str:
-        """Generate a unique recording ID."""
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        unique_suffix = uuid.uuid4().hex[:8]
-        return f"{timestamp}_{unique_suffix}"
+        """Generate a unique recording ID (YYYYmmdd_HHMMSS_<8 hex>, UTC)."""
+        # Same text as strftime("%Y%m%d_%H%M%S"), without a datetime object
+        t = time.gmtime()
+        return (f"{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}_"
+                f"{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}_{secrets.token_hex(4)}")
 
     def _generate_filename(self, recording_id: str, name: str) -> str:
         """Generate a safe filename for the recording (MPEG-TS format)."""
-        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip()
+        safe_name = _UNSAFE_FILENAME_RE.sub('', name).strip()
         safe_name = safe_name.replace(' ', '_')[:50]
         if not safe_name:
             safe_name = "recording"
         return f"{recording_id}_{safe_name}.ts"
 
-    def _is_recording_active(self, recording: Dict[str, Any]) -> bool:
-        """Check if a recording is actively running using DB-stored PID."""
+    def _live_pids(self, recordings: List[Dict[str, Any]]) -> set:
+        """PIDs of the pending recordings in `recordings` that are still running."""
+        return self.db.running_pids(
+            rec.get('pid') for rec in recordings
+            if rec.get('status') in ('recording', 'starting')
+        )
+
+    def _is_recording_active(self, recording: Dict[str, Any], live_pids: Optional[set] = None) -> bool:
+        """Check if a recording is actively running using DB-stored PID.
+
+        `live_pids` is a precomputed _live_pids() result covering this row.
+        """
         status = recording.get('status')
         if status not in ('recording', 'starting'):
             return False
 
         pid = recording.get('pid')
         if pid:
+            if live_pids is not None:
+                return pid in live_pids
             return self.db.is_pid_running(pid)
 
         if status == 'starting':
@@ -632,11 +856,19 @@ class RecordingManager:
 
         return recording.get('id') in self.processes
 
-    def _calculate_elapsed(self, started_at: str) -> int:
-        """Calculate elapsed seconds from ISO timestamp.
+    def _calculate_elapsed(self, recording: Dict[str, Any]) -> int:
+        """Calculate elapsed seconds since the recording started.
 
+        Uses the epoch started_at_ts column; rows without it fall back to
+        parsing the ISO started_at.
         Note: Database stores naive UTC timestamps, so we use naive comparison.
         """
+        started_at_ts = recording.get('started_at_ts')
+        if started_at_ts:
+            return int(time.time() - started_at_ts)
+        started_at = recording.get('started_at')
+        if not started_at:
+            return 0
         try:
             start = datetime.fromisoformat(started_at)
             # Database stores naive UTC, so compare with naive UTC
@@ -645,9 +877,9 @@ class RecordingManager:
         except Exception:
             return 0
 
-    def _enrich_recording(self, recording: Dict[str, Any]) -> Dict[str, Any]:
+    def _enrich_recording(self, recording: Dict[str, Any], live_pids: Optional[set] = None) -> Dict[str, Any]:
         """Add computed fields (is_active, elapsed_seconds) to a recording."""
-        recording['is_active'] = self._is_recording_active(recording)
+        recording['is_active'] = self._is_recording_active(recording, live_pids)
         if recording['is_active'] and recording.get('started_at'):
-            recording['elapsed_seconds'] = self._calculate_elapsed(recording['started_at'])
+            recording['elapsed_seconds'] = self._calculate_elapsed(recording)
         return recording
@@ -0,0 +1,45 @@
+"""Optional RE2 backend for regexes that scan untrusted HTML.
+
+google-re2 matches in linear time, so lazy/dot-all patterns over large
+scraped pages cannot backtrack catastrophically. When the package is not
+installed (or a pattern uses syntax RE2 lacks, e.g. backreferences) the
+stdlib engine is used, so callers get an object with the usual
+search/match/fullmatch API either way.
+"""
+
+import logging
+import re
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+logger = logging.getLogger(__name__)
+
+_INLINE_FLAGS = (
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+)
+
+if re2 is not None:
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.log_errors = False
+
+
+def compile_re(pattern, flags: int = 0):
+    """Compile `pattern` with RE2 when available, else with the stdlib `re`."""
+    if re2 is None:
+        return re.compile(pattern, flags)
+    # RE2 only understands flags written inline
+    inline = "".join(letter for flag, letter in _INLINE_FLAGS if flags & flag)
+    re2_pattern = pattern
+    if inline:
+        prefix = f"(?{inline})"
+        re2_pattern = (prefix.encode() if isinstance(pattern, bytes) else prefix) + pattern
+    try:
+        return re2.compile(re2_pattern, _RE2_OPTIONS)
+    except re2.error:
+        logger.debug(f"Pattern not supported by RE2, using re: {pattern!r}")
+        return re.compile(pattern, flags)
@@ -0,0 +1,68 @@
+"""Process-wide aiohttp sessions shared by the extractors.
+
+Extractor instances are short-lived (they are closed after every extraction),
+so owning a ClientSession each threw away TCP/TLS connections and the DNS
+cache on every request. Sessions here are keyed by proxy URL (None = direct)
+and live until the app shuts down.
+
+They never store cookies: every extraction, for every client, goes through
+them, so a jar would replay one extraction's cookies on the next. Extractors
+that need cookie state send the Cookie header themselves or use a private
+session.
+"""
+
+import logging
+
+from aiohttp import ClientSession, ClientTimeout, DummyCookieJar, TCPConnector
+
+from config import get_connector_for_proxy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+
+# Bounded pools: an unbounded connector lets a burst of extractions exhaust
+# file descriptors instead of queueing for (and reusing) idle connections.
+_CONNECTOR_KWARGS = {
+    "limit": 100,
+    "limit_per_host": 20,
+    "ttl_dns_cache": 300,
+    "keepalive_timeout": 75,
+    "enable_cleanup_closed": True,
+    "happy_eyeballs_delay": 0.25,
+}
+
+_SHARED_SESSIONS: dict[str | None, ClientSession] = {}
+
+
+def get_shared_session(proxy: str | None = None) -> ClientSession:
+    """Return the shared session for `proxy`, creating it on first use.
+
+    Must be called from a running event loop. Callers must never close the
+    returned session: other extractions are using it. An extractor that
+    needs fresh connections opens a short-lived session of its own.
+    """
+    session = _SHARED_SESSIONS.get(proxy)
+    if session is None or session.closed:
+        if proxy:
+            connector = get_connector_for_proxy(proxy, **_CONNECTOR_KWARGS)
+        else:
+            connector = TCPConnector(use_dns_cache=True, **_CONNECTOR_KWARGS)
+        session = ClientSession(
+            timeout=ClientTimeout(total=60, connect=30, sock_read=30),
+            connector=connector,
+            cookie_jar=DummyCookieJar(),
+            headers={"User-Agent": DEFAULT_USER_AGENT},
+        )
+        _SHARED_SESSIONS[proxy] = session
+        logger.debug(f"Created shared extractor session (proxy={proxy})")
+    return session
+
+
+async def shutdown_sessions():
+    """Close every shared session. Called once on app cleanup."""
+    sessions = list(_SHARED_SESSIONS.values())
+    _SHARED_SESSIONS.clear()
+    for session in sessions:
+        if not session.closed:
+            await session.close()
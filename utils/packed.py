@@ -19,6 +19,11 @@ import logging
 import asyncio
 from config import ALL_PROXY_ERRORS
 
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 
 logger = logging.getLogger(__name__)
 
@@ -142,8 +147,12 @@ class UnpackingError(Exception):
     pass
 
 def _parse_scripts(text):
+    """Return the inline text of every <script> in `text`."""
+    if HTMLParser is not None:
+        # Lexbor (C) parser: no Python object tree for the rest of the page
+        return [node.text(deep=True) for node in HTMLParser(text).css("script")]
     soup = BeautifulSoup(text, "lxml", parse_only=SoupStrainer("script"))
-    return soup.find_all("script")
+    return [script.text for script in soup.find_all("script")]
 
 async def eval_solver(session, url: str, headers: dict, patterns: list[str]) -> str:
     try:
@@ -166,14 +175,11 @@ async def eval_solver(session, url: str, headers: dict, patterns: list[str]) ->
                 logger.warning("Video not available at %s: detected '%s'", url, indicator)
                 raise UnpackingError(f"Video not found or unavailable at {url}")
         
-        # BS4 parsing is CPU-bound, run in executor
+        # HTML parsing is CPU-bound, run in executor
         loop = asyncio.get_event_loop()
         script_all = await loop.run_in_executor(None, lambda: _parse_scripts(text))
 
-        packed_scripts = []
-        for i in script_all:
-            if i.text and detect(i.text):
-                packed_scripts.append(i.text)
+        packed_scripts = [script for script in script_all if script and detect(script)]
         
         if not packed_scripts:
             logger.warning("No packed JavaScript found at %s. Page may have changed structure.", url)
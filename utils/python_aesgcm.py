@@ -2,13 +2,25 @@
 # Adapted from https://github.com/Gujal00/ResolveURL/blob/master/script.module.resolveurl/lib/resolveurl/plugins/f16px.py
 
 import struct
-import binascii
 import hmac
 
+# Native AEAD implementations (OpenSSL / PyCryptodome C code: AES-NI + CLMUL
+# where the CPU has them). The pure-Python GCM below is only the last resort.
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM as _NativeAESGCM
+    from cryptography.exceptions import InvalidTag
+except ImportError:
+    _NativeAESGCM = None
+
+try:
+    from Crypto.Cipher import AES as _CryptoAES
+except ImportError:
+    _CryptoAES = None
+
 
 def _bytes_to_int(data):
     """Convert bytes to integer."""
-    return int(binascii.hexlify(data), 16)
+    return int.from_bytes(data, byteorder='big')
 
 
 def _int_to_bytes(n, length):
@@ -17,25 +29,26 @@ def _int_to_bytes(n, length):
 
 
 def _xor_bytes(a, b):
-    """XOR two byte strings."""
-    return bytes(x ^ y for x, y in zip(a, b))
+    """XOR two byte strings of equal length (as big integers, in C)."""
+    n = len(a)
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(n, 'big')
 
 
-def _aes_block_encrypt(key, block):
-    """AES single block encryption using PyCryptodome or fallback."""
-    try:
-        from Crypto.Cipher import AES as CryptoAES
-        cipher = CryptoAES.new(key, CryptoAES.MODE_ECB)
-        return cipher.encrypt(block)
-    except ImportError:
-        pass
+def _ecb_encryptor(key):
+    """Return a reusable AES-ECB encrypt callable (any multiple of 16 bytes).
+
+    The key schedule is expanded once; ECB has no chaining, so the same
+    object can encrypt any number of independent blocks.
+    """
+    if _CryptoAES is not None:
+        return _CryptoAES.new(key, _CryptoAES.MODE_ECB).encrypt
     
     try:
         from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
         from cryptography.hazmat.backends import default_backend
         cipher = Cipher(algorithms.AES(key), modes.ECB(), backend=default_backend())
-        encryptor = cipher.encryptor()
-        return encryptor.update(block) + encryptor.finalize()
+        # Never finalized: update() alone returns every complete block
+        return cipher.encryptor().update
     except ImportError:
         pass
     
@@ -56,8 +69,24 @@ def _gf_mult(a, b):
     return result
 
 
-def _ghash(h_int, aad, ciphertext):
-    """GHASH function for GCM."""
+def _mul_x4(v):
+    """Multiply by x^4 in GF(2^128) (GCM bit order), bit by bit."""
+    for _ in range(4):
+        v = (v >> 1) ^ (0xe1 << 120 if v & 1 else 0)
+    return v
+
+
+# Reduction of the 4 bits shifted out by a x^4 step (Shoup's R table)
+_R4 = tuple(_mul_x4(r) for r in range(16))
+
+
+def _ghash_table(h_int):
+    """Precompute M[i] = i * H for every 4-bit i (Shoup's 4-bit method)."""
+    return tuple(_gf_mult(i << 124, h_int) for i in range(16))
+
+
+def _ghash(m_table, aad, ciphertext):
+    """GHASH function for GCM (4-bit table, NIST SP 800-38D)."""
     def _pad16(data):
         if len(data) % 16:
             return data + b'\x00' * (16 - len(data) % 16)
@@ -68,58 +97,92 @@ def _ghash(h_int, aad, ciphertext):
     
     y = 0
     for i in range(0, len(data), 16):
-        block_int = _bytes_to_int(data[i:i+16])
-        y = _gf_mult(y ^ block_int, h_int)
+        x = y ^ _bytes_to_int(data[i:i+16])
+        # Horner over the 32 nibbles, highest-degree one (lowest bits) first
+        z = 0
+        for shift in range(0, 128, 4):
+            z = (z >> 4) ^ _R4[z & 0xf] ^ m_table[(x >> shift) & 0xf]
+        y = z
     
     return y
 
 
 class AESGCM:
-    """Pure Python AES-GCM implementation."""
+    """AES-GCM decryption: native when available, pure Python otherwise."""
     
     def __init__(self, key):
         self.key = key
-        # Compute H = E(K, 0^128)
-        h_block = _aes_block_encrypt(key, b'\x00' * 16)
-        self.h_int = _bytes_to_int(h_block)
+        self._ecb = None
+        self._h_int = None
+        self._m_table = None
+    
+    @property
+    def h_int(self):
+        """GHASH key H = E(K, 0^128), only needed by the pure-Python path."""
+        if self._h_int is None:
+            self._ecb = _ecb_encryptor(self.key)
+            self._h_int = _bytes_to_int(self._ecb(b'\x00' * 16))
+            self._m_table = _ghash_table(self._h_int)
+        return self._h_int
     
     def open(self, nonce, ciphertext_with_tag, aad=b''):
-        """Decrypt and verify AES-GCM ciphertext."""
+        """Decrypt and verify AES-GCM ciphertext (None if authentication fails)."""
         if len(ciphertext_with_tag) < 16:
             return None
         
+        if _NativeAESGCM is not None:
+            try:
+                return _NativeAESGCM(self.key).decrypt(nonce, ciphertext_with_tag, aad or None)
+            except InvalidTag:
+                return None
+        
+        if _CryptoAES is not None:
+            cipher = _CryptoAES.new(self.key, _CryptoAES.MODE_GCM, nonce=nonce)
+            if aad:
+                cipher.update(aad)
+            try:
+                return cipher.decrypt_and_verify(ciphertext_with_tag[:-16], ciphertext_with_tag[-16:])
+            except ValueError:
+                return None
+        
+        return self._open_python(nonce, ciphertext_with_tag, aad)
+    
+    def _open_python(self, nonce, ciphertext_with_tag, aad=b''):
+        """Reference GCM in pure Python."""
         ciphertext = ciphertext_with_tag[:-16]
         tag = ciphertext_with_tag[-16:]
+        self.h_int  # also sets up self._ecb and self._m_table
+        m_table = self._m_table
         
         # Compute J0 (counter block)
         if len(nonce) == 12:
             j0 = nonce + b'\x00\x00\x00\x01'
         else:
             # For other nonce lengths, use GHASH
-            ghash_result = _ghash(self.h_int, b'', nonce)
+            ghash_result = _ghash(m_table, b'', nonce)
             j0 = _int_to_bytes(ghash_result, 16)
         
-        # Generate keystream and decrypt
-        plaintext = bytearray()
-        counter = _bytes_to_int(j0)
-        
-        for i in range(0, len(ciphertext), 16):
-            counter = (counter & 0xffffffffffffffffffffffff00000000) | (((counter & 0xffffffff) + 1) & 0xffffffff)
-            counter_block = _int_to_bytes(counter, 16)
-            keystream = _aes_block_encrypt(self.key, counter_block)
-            block = ciphertext[i:i+16]
-            plaintext.extend(_xor_bytes(block, keystream[:len(block)]))
+        # Generate keystream and decrypt: all counter blocks go through a
+        # single ECB call instead of one cipher call per block
+        n_blocks = (len(ciphertext) + 15) // 16
+        prefix = j0[:12]
+        base = struct.unpack('>I', j0[12:])[0]
+        counter_blocks = bytearray(n_blocks * 16)
+        for i in range(n_blocks):
+            struct.pack_into('>12sI', counter_blocks, i * 16, prefix, (base + i + 1) & 0xffffffff)
+        keystream = self._ecb(bytes(counter_blocks))
+        plaintext = _xor_bytes(ciphertext, keystream[:len(ciphertext)])
         
         # Compute expected tag
-        s = _ghash(self.h_int, aad, ciphertext)
-        j0_encrypted = _aes_block_encrypt(self.key, j0)
+        s = _ghash(m_table, aad, ciphertext)
+        j0_encrypted = self._ecb(j0)
         expected_tag = _xor_bytes(_int_to_bytes(s, 16), j0_encrypted)
         
         # Verify tag using constant-time comparison
         if not hmac.compare_digest(tag, expected_tag):
             return None
         
-        return bytes(plaintext)
+        return plaintext
 
 
 def new(key):